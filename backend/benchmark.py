@@ -0,0 +1,1142 @@
+#!/usr/bin/env python3
+"""
+Standalone performance benchmarks for the backend.
+Run from the backend directory, for example:
+
+    python benchmark.py startup --max-seconds 3
+    python benchmark.py login --concurrency 20 --requests 200
+    python benchmark.py sqlite --writers 8 --readers 8 --seconds 5
+    python benchmark.py reads --concurrency 50 --requests 2000
+    python benchmark.py explain --students 5000
+    python benchmark.py attendance --sizes 1,60,5000
+    python benchmark.py queries --page-sizes 1,10,100,500
+    python benchmark.py pagination --rows 1000000 --page 500
+    python benchmark.py data-stats --rows 1000000
+    python benchmark.py serialize --results 10000
+    python benchmark.py compression --rows 500
+
+Each benchmark prints its measurements and exits non-zero when a regression
+threshold is exceeded, so it can be used as a CI guard.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+async def asgi_request(app, method: str, path: str, headers: dict = None, body: bytes = b""):
+    """Send one request straight into an ASGI app and return (status, headers, body)"""
+    query = ""
+    if "?" in path:
+        path, query = path.split("?", 1)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextlib.contextmanager
+def count_statements(engine):
+    """Count SQL statements sent to the database while the block runs, leaving out the
+    background recounts of stats.CountRefresher threads"""
+    from sqlalchemy import event
+
+    counter = {"statements": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not threading.current_thread().name.endswith("-refresher"):
+            counter["statements"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def load_seeded_app(tmp: str):
+    """Import the app against a fresh SQLite database seeded with the mock data"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+    import seed_data
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        seed_data.seed_database()
+    return main
+
+
+async def run_concurrently(coroutine_factory, total: int, concurrency: int):
+    """Run total coroutines with at most concurrency in flight; return per-call latencies"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await coroutine_factory(i)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies
+
+
+def run_startup_probe():
+    """Import the app, run startup handlers and serve one request (runs in a fresh interpreter)"""
+    started = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+    imported = time.perf_counter()
+
+    async def first_request():
+        await main.app.router.startup()
+        status, _, _ = await asgi_request(main.app, "GET", "/health")
+        await main.app.router.shutdown()
+        return status
+
+    status = asyncio.run(first_request())
+    finished = time.perf_counter()
+    print(json.dumps({
+        "status": status,
+        "import_seconds": imported - started,
+        "first_request_seconds": finished - started,
+    }))
+
+
+def benchmark_startup(args) -> int:
+    """Measure import-to-first-request time of main.py in fresh interpreters"""
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_startup-probe"],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            timings.append(json.loads(output.strip().splitlines()[-1]))
+
+    imports = [t["import_seconds"] for t in timings]
+    totals = [t["first_request_seconds"] for t in timings]
+    print(f"Startup over {args.runs} run(s):")
+    print(f"   import main:            median {statistics.median(imports):.3f}s  max {max(imports):.3f}s")
+    print(f"   import -> first request: median {statistics.median(totals):.3f}s  max {max(totals):.3f}s")
+
+    if any(t["status"] != 200 for t in timings):
+        print("❌ First request did not return 200")
+        return 1
+    if statistics.median(totals) > args.max_seconds:
+        print(f"❌ Startup regression: median above {args.max_seconds:.2f}s")
+        return 1
+    print("✅ Startup within budget")
+    return 0
+
+
+def benchmark_login(args) -> int:
+    """Concurrent /auth/login load: statements per login and p50/p99 latency"""
+    # Admit the whole burst: this measures login cost, not the password service's back-pressure
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(args.concurrency))
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        accounts = [("admin", "admin123"), ("math_teacher", "teacher123"), ("student001", "student123")]
+        failures = []
+
+        async def login(i):
+            username, password = accounts[i % len(accounts)]
+            body = json.dumps({"username": username, "password": password}).encode()
+            status, _, _ = await asgi_request(
+                main.app, "POST", "/auth/login", {"content-type": "application/json"}, body
+            )
+            if status != 200:
+                failures.append(status)
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                with count_statements(main.engine) as counter:
+                    started = time.perf_counter()
+                    latencies = await run_concurrently(login, args.requests, args.concurrency)
+                    elapsed = time.perf_counter() - started
+            finally:
+                await main.app.router.shutdown()
+            return latencies, elapsed, counter["statements"]
+
+        latencies, elapsed, statements = asyncio.run(run())
+
+    per_login = statements / args.requests
+    print(f"/auth/login x{args.requests} (concurrency {args.concurrency}):")
+    print(f"   statements per login: {per_login:.2f}")
+    print(f"   p50 {percentile(latencies, 50) * 1000:.1f} ms   p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"   throughput {args.requests / elapsed:.1f} logins/s   failures {len(failures)}")
+
+    if failures:
+        print(f"❌ {len(failures)} login(s) failed: {sorted(set(failures))}")
+        return 1
+    if per_login > args.max_statements:
+        print(f"❌ Query regression: more than {args.max_statements} statements per login")
+        return 1
+    if args.max_p99_ms and percentile(latencies, 99) * 1000 > args.max_p99_ms:
+        print(f"❌ Latency regression: p99 above {args.max_p99_ms:.0f} ms")
+        return 1
+    print("✅ Login within budget")
+    return 0
+
+
+def add_sync_schedule_route(main):
+    """Register a sync twin of GET /student/{id}/schedule, as it was before the async port"""
+    from typing import List
+    from fastapi import Depends
+    from sqlmodel import Session, select
+
+    def sync_student_schedule(
+        student_id: int,
+        session: Session = Depends(main.get_session),
+        current_user: main.User = Depends(main.get_current_active_user),
+        claims: main.TokenClaims = Depends(main.get_token_claims),
+    ):
+        main.validate_student_access(student_id, current_user, session, claims)
+        class_id = main.get_student_class_id(student_id, session, claims)
+        statement = select(main.ClassSchedule).options(*main.CLASS_SCHEDULE_READ_OPTIONS).where(
+            main.ClassSchedule.class_id == class_id
+        ).order_by(main.ClassSchedule.start_time)
+        return session.exec(statement).all()
+
+    main.app.add_api_route(
+        "/benchmark/sync/student/{student_id}/schedule", sync_student_schedule,
+        response_model=List[main.ClassScheduleRead],
+    )
+
+
+def benchmark_reads(args) -> int:
+    """Requests/sec of the async student read path against its sync twin on one worker"""
+    import anyio
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        add_sync_schedule_route(main)
+
+        async def run():
+            await main.app.router.startup()
+            # One worker with Starlette's default threadpool size (or --threads)
+            anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+            try:
+                body = json.dumps({"username": "student001", "password": "student123"}).encode()
+                _, _, raw = await asgi_request(
+                    main.app, "POST", "/auth/login", {"content-type": "application/json"}, body
+                )
+                login = json.loads(raw)
+                headers = {"authorization": f"Bearer {login['access_token']}"}
+                student_id = login["user"]["student_id"]
+
+                results = {}
+                for label, path in (
+                    ("sync", f"/benchmark/sync/student/{student_id}/schedule"),
+                    ("async", f"/student/{student_id}/schedule"),
+                ):
+                    failures = []
+
+                    async def fetch(i):
+                        status, _, _ = await asgi_request(main.app, "GET", path, headers)
+                        if status != 200:
+                            failures.append(status)
+
+                    await run_concurrently(fetch, args.concurrency, args.concurrency)  # warm-up
+                    started = time.perf_counter()
+                    latencies = await run_concurrently(fetch, args.requests, args.concurrency)
+                    results[label] = {
+                        "rps": args.requests / (time.perf_counter() - started),
+                        "latencies": latencies,
+                        "failures": failures,
+                    }
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+
+    print(f"GET /student/{{id}}/schedule x{args.requests} (concurrency {args.concurrency}, {args.threads} threads):")
+    for label, r in results.items():
+        print(f"   {label:<6} {r['rps']:8.1f} req/s   p50 {percentile(r['latencies'], 50) * 1000:7.1f} ms   "
+              f"p99 {percentile(r['latencies'], 99) * 1000:7.1f} ms   failures {len(r['failures'])}")
+
+    if any(r["failures"] for r in results.values()):
+        print("❌ Some requests failed")
+        return 1
+    speedup = results["async"]["rps"] / results["sync"]["rps"]
+    if speedup < args.min_speedup:
+        print(f"❌ Async path is {speedup:.2f}x the sync path (expected at least {args.min_speedup:.2f}x)")
+        return 1
+    print(f"✅ Async path {speedup:.2f}x the sync path")
+    return 0
+
+
+def seed_explain_dataset(engine, students: int):
+    """Bulk-insert a synthetic dataset large enough for the planners to prefer indexes"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from models import (
+        Attendance, Class, ClassSchedule, DayOfWeek, Exam, ExamResult,
+        Notice, Student, StudyMaterial, Subject, Teacher, TeacherReview, User,
+    )
+
+    now = datetime.utcnow()
+    classes = max(10, students // 100)
+    teachers = max(20, students // 50)
+    subjects = classes * 5
+    days = list(DayOfWeek)
+
+    def rows(count, build):
+        return [build(i) for i in range(1, count + 1)]
+
+    with engine.begin() as conn:
+        conn.execute(insert(Class), rows(classes, lambda i: {
+            "id": i, "name": f"Class {i}", "grade": i % 7 + 6, "capacity": 100}))
+        conn.execute(insert(User), rows(students + teachers, lambda i: {
+            "id": i, "username": f"user{i}", "email": f"user{i}@example.com", "full_name": f"User {i}",
+            "role": "student" if i <= students else "teacher", "is_active": True,
+            "password_hash": "x", "token_version": 0, "created_at": now}))
+        conn.execute(insert(Student), rows(students, lambda i: {
+            "id": i, "roll_number": f"R{i:06d}", "user_id": i, "class_id": i % classes + 1, "admission_date": now}))
+        conn.execute(insert(Teacher), rows(teachers, lambda i: {
+            "id": i, "employee_id": f"E{i:05d}", "user_id": students + i, "joining_date": now}))
+        conn.execute(insert(Subject), rows(subjects, lambda i: {
+            "id": i, "name": f"Subject {i}", "code": f"S{i:05d}", "credits": 3, "class_id": i % classes + 1}))
+        conn.execute(insert(ClassSchedule), rows(subjects * 4, lambda i: {
+            "day_of_week": days[i % len(days)].value, "start_time": f"{8 + i % 8:02d}:00",
+            "end_time": f"{9 + i % 8:02d}:00", "subject_id": i % subjects + 1, "class_id": i % classes + 1,
+            "teacher_id": i % teachers + 1, "created_at": now}))
+        conn.execute(insert(Attendance), rows(students * 30, lambda i: {
+            "date": now - timedelta(days=i // students), "status": "present",
+            "student_id": i % students + 1, "class_id": (i % students) % classes + 1}))
+        conn.execute(insert(Exam), rows(subjects * 4, lambda i: {
+            "id": i, "name": f"Exam {i}", "exam_date": now - timedelta(hours=i), "max_marks": 100, "duration_minutes": 60,
+            "subject_id": i % subjects + 1, "class_id": i % classes + 1}))
+        conn.execute(insert(ExamResult), rows(students * 8, lambda i: {
+            "marks_obtained": 50.0, "exam_id": i // students + 1, "student_id": i % students + 1}))
+        conn.execute(insert(StudyMaterial), rows(subjects * 20, lambda i: {
+            "title": f"Material {i}", "is_public": i % 4 != 0, "subject_id": i % subjects + 1,
+            "created_by_id": students + i % teachers + 1, "created_at": now - timedelta(minutes=i)}))
+        conn.execute(insert(Notice), rows(students, lambda i: {
+            "title": f"Notice {i}", "content": "...", "target_role": ("student", "teacher", None)[i % 3],
+            "is_urgent": False, "show_on_landing": i % 10 == 0, "is_active": i % 20 != 0,
+            "created_by_id": students + 1, "created_at": now - timedelta(minutes=i)}))
+        conn.execute(insert(TeacherReview), rows(students * 2, lambda i: {
+            "teaching_quality": i % 5 + 1, "teacher_id": i % teachers + 1, "reviewed_by_id": i % students + 1,
+            "review_date": now - timedelta(minutes=i)}))
+
+
+def explain_requests(now) -> list:
+    """The hot read paths, as (name, method, path, json body) requests to the endpoints that run them.
+    Keyset listings (?cursor=) are also checked on their second page, whose statement adds the cursor predicate."""
+    today = now.date().isoformat()
+    return [
+        ("GET /student/{id}/attendance", "GET", "/student/42/attendance", None),
+        ("GET /student/{id}/attendance?cursor", "GET", "/student/42/attendance?cursor=", None),
+        ("POST /admin/attendance/bulk (duplicate check)", "POST", "/admin/attendance/bulk",
+         [{"student_id": 42, "class_id": 3, "date": now.isoformat(), "status": "present"}]),
+        ("GET /admin/attendance?class_id", "GET", "/admin/attendance?class_id=3", None),
+        ("GET /admin/attendance?class_id&date", "GET", f"/admin/attendance?class_id=3&date={today}", None),
+        ("GET /admin/attendance?cursor", "GET", "/admin/attendance?cursor=", None),
+        ("GET /student/{id}/exam-results", "GET", "/student/42/exam-results", None),
+        ("GET /teacher/{id}/schedule", "GET", "/teacher/7/schedule", None),
+        ("GET /student/{id}/schedule", "GET", "/student/42/schedule", None),
+        ("POST /admin/class-schedules (conflict check)", "POST", "/admin/class-schedules",
+         {"class_id": 3, "subject_id": 3, "teacher_id": 7, "day_of_week": "sunday",
+          "start_time": "06:00:00", "end_time": "07:00:00"}),
+        ("GET /student/{id}/notices", "GET", "/student/42/notices", None),
+        ("GET /public/notices", "GET", "/public/notices", None),
+        ("GET /student/{id}/subjects", "GET", "/student/42/subjects", None),
+        ("GET /student/{id}/study-materials", "GET", "/student/42/study-materials", None),
+        ("GET /teacher/{id}/study-materials", "GET", "/teacher/7/study-materials", None),
+        ("GET /teacher/{id}/exams", "GET", "/teacher/7/exams", None),
+        ("GET /teacher/{id}/students", "GET", "/teacher/7/students", None),
+        ("GET /admin/exams?cursor", "GET", "/admin/exams?cursor=", None),
+        ("GET /admin/class-schedules?cursor", "GET", "/admin/class-schedules?cursor=", None),
+        ("GET /admin/study-materials?cursor", "GET", "/admin/study-materials?cursor=", None),
+        ("GET /admin/study-materials?subject_id&cursor", "GET", "/admin/study-materials?subject_id=3&cursor=", None),
+        ("GET /admin/teacher-reviews?cursor", "GET", "/admin/teacher-reviews?cursor=", None),
+        ("GET /admin/teacher-reviews?teacher_id&cursor", "GET", "/admin/teacher-reviews?teacher_id=7&cursor=", None),
+    ]
+
+
+def plan_problems(dialect: str, cursor, statement: str, parameters, tables) -> list:
+    """What is wrong with the plan of one statement, EXPLAINed on the cursor about to run it:
+    tables read in full, and pages whose rows are all sorted before the LIMIT applies"""
+    import re
+
+    paged = re.search(r"\bLIMIT\b", statement, re.IGNORECASE) is not None
+    if dialect == "sqlite":
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        problems = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            # Tables appear under their alias; SQLAlchemy's aliases are "<table>_<n>". An
+            # automatic index is one SQLite builds by reading the whole table first.
+            scan = re.match(r"(?:SCAN (\w+)$|SEARCH (\w+) USING AUTOMATIC)", detail)
+            table = scan and re.sub(r"_\d+$", "", scan.group(1) or scan.group(2))
+            if table in tables and not re.search(rf"WHERE {table}\.id IN \(", statement):
+                # (a primary-key IN list, e.g. from selectinload, is read in full when it names
+                # a large share of the table; that is the planner's choice, not a missing index)
+                problems.append(f"full scan of {table}")
+            elif paged and detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail:
+                problems.append("sorts every matching row for one page")
+        return problems
+
+    # Postgres: with sequential scans priced out, any that remain have no usable index
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    problems = []
+
+    def walk(node, parent):
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in tables:
+            problems.append(f"full scan of {node['Relation Name']}")
+        if node.get("Node Type") == "Sort" and parent == "Limit":
+            problems.append("sorts every matching row for one page")
+        for child in node.get("Plans", []):
+            walk(child, node.get("Node Type"))
+
+    walk(plan[0]["Plan"], None)
+    return problems
+
+
+def benchmark_explain(args) -> int:
+    """EXPLAIN every statement the hot endpoints run, against a large dataset, and fail on
+    full table scans or whole-result sorts behind a page"""
+    from datetime import datetime
+    from sqlalchemy import event, func, select
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url:
+            # Must point at an empty, disposable database
+            os.environ["DATABASE_URL"] = args.database_url
+        else:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'explain.db')}"
+        sys.path.insert(0, BACKEND_DIR)
+        from sqlmodel import SQLModel
+        import database
+        import main
+        from models import User
+
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            database.create_db_and_tables()
+        started = time.perf_counter()
+        seed_explain_dataset(database.engine, args.students)
+        with database.engine.begin() as conn:
+            admin_id = conn.execute(select(func.max(User.id))).scalar() + 1
+            conn.execute(User.__table__.insert().values(
+                id=admin_id, username="explain_admin", email="explain_admin@example.com", full_name="Explain Admin",
+                role="admin", is_active=True, password_hash="x", token_version=0, created_at=datetime.utcnow()))
+            conn.exec_driver_sql("ANALYZE")
+        print(f"Seeded {args.students} students' worth of data in {time.perf_counter() - started:.1f}s "
+              f"({database.engine.dialect.name})")
+
+        with main.Session(database.engine) as session:
+            admin = session.get(User, admin_id)
+            token = main.create_access_token(main.build_token_claims(admin, {}))
+        headers = {"authorization": f"Bearer {token}", "content-type": "application/json"}
+
+        tables = set(SQLModel.metadata.tables)
+        found = []  # problems of the request being sent
+        explained = [0]
+
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            if executemany or threading.current_thread().name.endswith("-refresher"):
+                return
+            if not statement.lstrip()[:6].upper() in ("SELECT", "WITH"):
+                return
+            explained[0] += 1
+            found.extend(plan_problems(conn.dialect.name, cursor, statement, parameters, tables))
+
+        engines = {id(e): e for e in (database.engine, database.read_engine,
+                                      database.async_engine.sync_engine, database.async_read_engine.sync_engine)}
+
+        async def run():
+            await main.app.router.startup()
+            results = []
+            for engine in engines.values():
+                event.listen(engine, "before_cursor_execute", explain)
+            try:
+                requests = explain_requests(datetime.utcnow())
+                while requests:
+                    name, method, path, body = requests.pop(0)
+                    found.clear()
+                    explained[0] = 0
+                    try:
+                        status, _, raw = await asgi_request(
+                            main.app, method, path, headers, json.dumps(body).encode() if body is not None else b"")
+                    except Exception as exc:
+                        status, raw = 500, repr(exc).encode()
+                    results.append((name, status, raw, explained[0], list(found)))
+                    if path.endswith("cursor=") and status == 200:
+                        next_cursor = json.loads(raw)["next_cursor"]
+                        if next_cursor:
+                            requests.insert(0, (f"{name} (page 2)", method, path + next_cursor, body))
+            finally:
+                for engine in engines.values():
+                    event.remove(engine, "before_cursor_execute", explain)
+                await main.app.router.shutdown()
+                await database.async_engine.dispose()
+                await database.async_read_engine.dispose()
+            return results
+
+        results = asyncio.run(run())
+        database.engine.dispose()
+        database.read_engine.dispose()
+
+    failures = 0
+    for name, status, raw, statements, problems in results:
+        if status >= 500 or status in (401, 403, 404, 422):
+            failures += 1
+            print(f"   ❌ {name}: returned {status}: {raw[:200]!r}")
+        elif not statements:
+            failures += 1
+            print(f"   ❌ {name}: ran no queries to check")
+        elif problems:
+            failures += 1
+            print(f"   ❌ {name}: {', '.join(sorted(set(problems)))}")
+        else:
+            print(f"   ✅ {name} ({statements} statements)")
+
+    if failures:
+        print(f"❌ {failures} endpoint(s) ran degraded query plans")
+        return 1
+    print("✅ All hot queries use indexes")
+    return 0
+
+
+def add_roster_students(engine, count: int) -> tuple:
+    """Insert count extra students into one class; return (class_id, student ids)"""
+    from datetime import datetime
+    from sqlalchemy import insert, select, func
+    from models import Class, Student, User
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        first_user = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        first_student = (conn.execute(select(func.max(Student.id))).scalar() or 0) + 1
+        class_id = conn.execute(insert(Class).values(name="Benchmark roster", grade=12, capacity=100)).inserted_primary_key[0]
+        conn.execute(insert(User), [{
+            "id": first_user + i, "username": f"roster{i}", "email": f"roster{i}@example.com",
+            "full_name": f"Roster {i}", "role": "student", "is_active": True,
+            "password_hash": "x", "token_version": 0, "created_at": now} for i in range(count)])
+        conn.execute(insert(Student), [{
+            "id": first_student + i, "roll_number": f"B{i:06d}", "user_id": first_user + i,
+            "class_id": class_id, "admission_date": now} for i in range(count)])
+    return class_id, list(range(first_student, first_student + count))
+
+
+def add_teachers(engine, count: int) -> None:
+    """Insert count extra teachers (with their users)"""
+    from datetime import datetime
+    from sqlalchemy import insert, select, func
+    from models import Teacher, User
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        first_user = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        conn.execute(insert(User), [{
+            "id": first_user + i, "username": f"staff{i}", "email": f"staff{i}@example.com",
+            "full_name": f"Staff {i}", "role": "teacher", "is_active": True,
+            "password_hash": "x", "token_version": 0, "created_at": now} for i in range(count)])
+        conn.execute(insert(Teacher), [{
+            "employee_id": f"B{i:05d}", "user_id": first_user + i, "joining_date": now} for i in range(count)])
+
+
+def benchmark_queries(args) -> int:
+    """Statements per listing page must not grow with the page size (no N+1 loads)"""
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    endpoints = ["/admin/students", "/admin/teachers"]
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        add_roster_students(main.engine, max(page_sizes))
+        add_teachers(main.engine, max(page_sizes))
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                body = json.dumps({"username": "admin", "password": "admin123"}).encode()
+                _, _, raw = await asgi_request(
+                    main.app, "POST", "/auth/login", {"content-type": "application/json"}, body
+                )
+                headers = {"authorization": f"Bearer {json.loads(raw)['access_token']}"}
+                results = {}
+                for endpoint in endpoints:
+                    for size in page_sizes:
+                        path = f"{endpoint}?limit={size}"
+                        await asgi_request(main.app, "GET", path, headers)  # warm the principal cache
+                        with count_statements(main.engine) as counter:
+                            status, _, raw = await asgi_request(main.app, "GET", path, headers)
+                        results[(endpoint, size)] = (status, len(json.loads(raw)), counter["statements"])
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+
+    failed = False
+    for endpoint in endpoints:
+        counts = {results[(endpoint, size)][2] for size in page_sizes}
+        print(f"GET {endpoint}:")
+        for size in page_sizes:
+            status, rows, statements = results[(endpoint, size)]
+            print(f"   limit {size:>5}   {rows:5d} rows   {statements:3d} statements   status {status}")
+            failed |= status != 200
+        if len(counts) > 1 or max(counts) > args.max_statements:
+            print(f"❌ {endpoint} statements vary with page size or exceed {args.max_statements}: {sorted(counts)}")
+            failed = True
+
+    if failed:
+        return 1
+    print("✅ Listing queries are constant per page")
+    return 0
+
+
+def seed_attendance_rows(engine, rows: int, students: int = 5000) -> None:
+    """Bulk-insert rows attendance marks (students x consecutive days), in chunks"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from models import Attendance
+
+    start = datetime(2020, 1, 1, 9)
+    chunk = 50000
+    with engine.begin() as conn:
+        for first in range(0, rows, chunk):
+            batch = []
+            for i in range(first, min(rows, first + chunk)):
+                day = start + timedelta(days=i // students, seconds=i % students)
+                batch.append({
+                    "date": day, "attendance_day": day.date(), "status": "present",
+                    "student_id": i % students + 1, "class_id": i % students % 50 + 1,
+                })
+            conn.execute(insert(Attendance), batch)
+
+
+def benchmark_pagination(args) -> int:
+    """Latency of the first and a deep page of /admin/attendance, offset vs cursor"""
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        started = time.perf_counter()
+        seed_attendance_rows(main.engine, args.rows)
+        print(f"Seeded {args.rows} attendance rows in {time.perf_counter() - started:.1f}s")
+
+        async def timed(path):
+            latencies = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                status, _, raw = await asgi_request(main.app, "GET", path)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    raise RuntimeError(f"{path} returned {status}: {raw[:200]!r}")
+            return statistics.median(latencies), raw
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                size, deep = args.page_size, args.page
+                results = {}
+                results["offset page 1"], _ = await timed(f"/admin/attendance?limit={size}")
+                results[f"offset page {deep}"], _ = await timed(f"/admin/attendance?limit={size}&skip={size * (deep - 1)}")
+                results["cursor page 1"], raw = await timed(f"/admin/attendance?limit={size}&cursor=")
+                cursor = json.loads(raw)["next_cursor"]
+                for _ in range(deep - 2):
+                    _, _, raw = await asgi_request(main.app, "GET", f"/admin/attendance?limit={size}&cursor={cursor}")
+                    cursor = json.loads(raw)["next_cursor"]
+                results[f"cursor page {deep}"], _ = await timed(f"/admin/attendance?limit={size}&cursor={cursor}")
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+
+    print(f"GET /admin/attendance, {args.page_size} rows per page (median of {args.repeat}):")
+    for label, seconds in results.items():
+        print(f"   {label:<18} {seconds * 1000:8.2f} ms")
+
+    ratio = results[f"cursor page {args.page}"] / results["cursor page 1"]
+    if ratio > args.max_ratio:
+        print(f"❌ Cursor page {args.page} is {ratio:.1f}x page 1 (budget {args.max_ratio:.1f}x)")
+        return 1
+    print(f"✅ Cursor page {args.page} costs {ratio:.1f}x page 1")
+    return 0
+
+
+def benchmark_data_stats(args) -> int:
+    """Latency of /admin/data-stats (exact, snapshot and estimated) against counting inline, on a large table"""
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        seed_attendance_rows(main.engine, args.rows)
+        with main.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))  # planner statistics for the estimated mode
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                results = {}
+                for mode in ("exact", "snapshot", "estimated"):
+                    path = f"/admin/data-stats?mode={mode}"
+                    latencies = []
+                    for _ in range(args.repeat + 1):
+                        started = time.perf_counter()
+                        status, _, raw = await asgi_request(main.app, "GET", path)
+                        latencies.append(time.perf_counter() - started)
+                        if status != 200:
+                            raise RuntimeError(f"{path} returned {status}: {raw[:200]!r}")
+                    stats = json.loads(raw)["database_statistics"]
+                    results[mode] = (statistics.median(latencies[1:]), stats["attendance_records"])
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+
+        started = time.perf_counter()
+        with Session(main.engine) as session:
+            main.count_rows(session, main.DATA_STATS_COUNTS)
+        inline = time.perf_counter() - started
+
+    print(f"GET /admin/data-stats with {args.rows} attendance rows (median of {args.repeat}):")
+    print(f"   counting inline   {inline * 1000:9.2f} ms   (one UNION ALL statement)")
+    for mode, (seconds, attendance) in results.items():
+        print(f"   {mode:<16}  {seconds * 1000:9.2f} ms   attendance_records={attendance}")
+
+    # exact counts inline by design; the budget is for the modes that avoid the scan
+    slowest = max(seconds for mode, (seconds, _) in results.items() if mode != "exact")
+    if slowest * 1000 > args.max_ms:
+        print(f"❌ /admin/data-stats (snapshot/estimated) took {slowest * 1000:.1f} ms (budget {args.max_ms:.0f} ms)")
+        return 1
+    print(f"✅ /admin/data-stats (snapshot/estimated) within {args.max_ms:.0f} ms")
+    return 0
+
+
+def benchmark_serialize(args) -> int:
+    """Serialization of nested exam results: response_model validation + json vs projection + orjson"""
+    import orjson
+    from typing import List
+    from pydantic import TypeAdapter
+    from sqlalchemy import insert, select as sa_select
+    from sqlmodel import Session, select
+    from models import Exam, ExamResult, ExamResultRead
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        _, student_ids = add_roster_students(main.engine, args.results)
+        with main.engine.begin() as conn:
+            exam_id = conn.execute(sa_select(Exam.id).limit(1)).scalar()
+            conn.execute(insert(ExamResult), [
+                {"exam_id": exam_id, "student_id": student_id, "marks_obtained": 40 + i % 60, "grade": "A", "remarks": "ok"}
+                for i, student_id in enumerate(student_ids)])
+
+        # Load both shapes up front: only serialization is timed
+        projection = main.EXAM_RESULT_PROJECTION
+        with Session(main.engine) as session:
+            rows = session.exec(projection.statement().where(ExamResult.id.in_(
+                select(ExamResult.id).where(ExamResult.student_id.in_(student_ids))))).all()
+            results = session.exec(select(ExamResult).where(ExamResult.student_id.in_(student_ids)).options(
+                *main.EXAM_RESULT_READ_OPTIONS)).all()
+
+            adapter = TypeAdapter(List[ExamResultRead])
+
+            def validated():
+                return adapter.dump_python(adapter.validate_python(results, from_attributes=True), mode="json")
+
+            modes = {
+                # What JSONResponse did before ORJSONResponse became the default
+                "response_model + json.dumps": lambda: json.dumps(
+                    validated(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode(),
+                "response_model + orjson": lambda: orjson.dumps(validated()),
+                "projection + orjson": lambda: orjson.dumps(projection.dicts(rows)),
+            }
+            timings, sizes = {}, {}
+            for label, serialize in modes.items():
+                latencies = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    body = serialize()
+                    latencies.append(time.perf_counter() - started)
+                timings[label], sizes[label] = statistics.median(latencies), len(body)
+            same = orjson.loads(modes["projection + orjson"]()) == orjson.loads(modes["response_model + orjson"]())
+
+    print(f"Serializing {len(rows)} nested exam results (median of {args.repeat}):")
+    for label, seconds in timings.items():
+        print(f"   {label:<28} {seconds * 1000:9.2f} ms   {sizes[label] / 1024:8.0f} KiB")
+
+    if not same:
+        print("❌ Projection output differs from the response_model output")
+        return 1
+    speedup = timings["response_model + json.dumps"] / timings["projection + orjson"]
+    if speedup < args.min_speedup:
+        print(f"❌ Projection is only {speedup:.1f}x faster (expected at least {args.min_speedup:.1f}x)")
+        return 1
+    print(f"✅ Projection + orjson is {speedup:.1f}x faster with identical output")
+    return 0
+
+
+def benchmark_compression(args) -> int:
+    """Response sizes and latency with and without compression; cached bodies are compressed once"""
+    from sqlalchemy import insert
+    from compression import COMPRESSION_MIN_SIZE, SUPPORTED_ENCODINGS
+    from models import Class
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        seed_attendance_rows(main.engine, args.rows, students=50)
+        with main.engine.begin() as conn:  # enough classes for /public/classes to be compressed
+            conn.execute(insert(Class), [{"name": f"Batch {i}", "grade": 10, "capacity": 40} for i in range(40)])
+        encodings = ("identity",) + SUPPORTED_ENCODINGS
+
+        async def timed(path, encoding):
+            latencies = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                status, headers, raw = await asgi_request(main.app, "GET", path, {"accept-encoding": encoding})
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    raise RuntimeError(f"{path} returned {status}: {raw[:200]!r}")
+            return statistics.median(latencies), len(raw), headers.get("content-encoding", "identity")
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                results = {}
+                for path in (f"/admin/attendance?limit={args.rows}", "/public/classes"):
+                    for encoding in encodings:
+                        results[(path, encoding)] = await timed(path, encoding)
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+        cached = main.public_cache.get("classes")
+
+    failed = False
+    for (path, encoding), (seconds, size, served) in results.items():
+        print(f"GET {path:<28} accept {encoding:<8} -> {served:<8} {size / 1024:8.1f} KiB   {seconds * 1000:7.2f} ms")
+        failed |= served != encoding and size >= COMPRESSION_MIN_SIZE
+    if cached is None or set(cached["encoded"]) != set(SUPPORTED_ENCODINGS):
+        print("❌ /public/classes cache entry does not hold its compressed variants")
+        failed = True
+
+    listing = f"/admin/attendance?limit={args.rows}"
+    ratio = results[(listing, "gzip")][1] / results[(listing, "identity")][1]
+    if failed or ratio > args.max_ratio:
+        print(f"❌ Compression not applied as expected (gzip/identity size ratio {ratio:.2f})")
+        return 1
+    print(f"✅ gzip body is {ratio:.0%} of the identity body")
+    return 0
+
+
+def benchmark_attendance(args) -> int:
+    """Round-trips and latency of POST /admin/attendance/bulk for several roster sizes"""
+    from datetime import datetime, timedelta
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory() as tmp:
+        main = load_seeded_app(tmp)
+        class_id, student_ids = add_roster_students(main.engine, max(sizes))
+
+        async def run():
+            await main.app.router.startup()
+            try:
+                body = json.dumps({"username": "admin", "password": "admin123"}).encode()
+                _, _, raw = await asgi_request(
+                    main.app, "POST", "/auth/login", {"content-type": "application/json"}, body
+                )
+                headers = {
+                    "authorization": f"Bearer {json.loads(raw)['access_token']}",
+                    "content-type": "application/json",
+                }
+                day = datetime(2030, 1, 1, 9)
+                results = {}
+                for size in sizes:
+                    statements, latencies, failures = [], [], []
+                    for _ in range(args.runs + 1):  # first run warms caches and is discarded
+                        day += timedelta(days=1)
+                        payload = json.dumps([
+                            {"student_id": student_id, "class_id": class_id,
+                             "date": day.isoformat(), "status": "present"}
+                            for student_id in student_ids[:size]
+                        ]).encode()
+                        with count_statements(main.engine) as counter:
+                            started = time.perf_counter()
+                            status, _, _ = await asgi_request(main.app, "POST", "/admin/attendance/bulk", headers, payload)
+                            latencies.append(time.perf_counter() - started)
+                        statements.append(counter["statements"])
+                        if status != 200:
+                            failures.append(status)
+                    results[size] = {
+                        "statements": max(statements[1:]),
+                        "latencies": latencies[1:],
+                        "failures": failures,
+                    }
+                return results
+            finally:
+                await main.app.router.shutdown()
+
+        results = asyncio.run(run())
+
+    print(f"POST /admin/attendance/bulk ({args.runs} runs per size):")
+    for size, r in results.items():
+        print(f"   {size:>6} records   {r['statements']:3d} round-trips   "
+              f"p50 {percentile(r['latencies'], 50) * 1000:8.1f} ms   "
+              f"{size / statistics.median(r['latencies']):10.0f} records/s   failures {len(r['failures'])}")
+
+    if any(r["failures"] for r in results.values()):
+        print("❌ Some requests failed")
+        return 1
+    worst = max(r["statements"] for r in results.values())
+    if worst > args.max_statements:
+        print(f"❌ Query regression: {worst} round-trips for one bulk request (budget {args.max_statements})")
+        return 1
+    print("✅ Bulk attendance round-trips independent of roster size")
+    return 0
+
+
+def run_sqlite_probe(args):
+    """Hammer the configured SQLite engine with writer and reader threads (runs in a fresh interpreter)"""
+    sys.path.insert(0, BACKEND_DIR)
+    from datetime import datetime
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session, select
+    import database
+    from models import Attendance
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        database.create_db_and_tables()
+
+    student_ids = itertools.count(1)
+    # Pause between operations, standing in for the request handling around each query
+    think = args.think_ms / 1000
+    deadline = time.perf_counter() + args.seconds
+    results = {"write": [], "read": [], "errors": 0}
+    results_lock = threading.Lock()
+
+    def record(kind, started):
+        with results_lock:
+            results[kind].append(time.perf_counter() - started)
+
+    def writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with Session(database.engine) as session:
+                    session.add(Attendance(
+                        student_id=next(student_ids), class_id=1,
+                        date=datetime.utcnow(), status="present",
+                    ))
+                    session.commit()
+                record("write", started)
+                time.sleep(think)
+            except OperationalError:
+                with results_lock:
+                    results["errors"] += 1
+
+    def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with Session(database.engine) as session:
+                    session.exec(
+                        select(Attendance).where(Attendance.class_id == 1)
+                        .order_by(Attendance.date.desc()).limit(50)
+                    ).all()
+                record("read", started)
+                time.sleep(think)
+            except OperationalError:
+                with results_lock:
+                    results["errors"] += 1
+
+    with ThreadPoolExecutor(max_workers=args.writers + args.readers) as executor:
+        for _ in range(args.writers):
+            executor.submit(writer)
+        for _ in range(args.readers):
+            executor.submit(reader)
+
+    print(json.dumps({
+        "writes_per_second": len(results["write"]) / args.seconds,
+        "reads_per_second": len(results["read"]) / args.seconds,
+        "write_p99_ms": percentile(results["write"], 99) * 1000,
+        "read_p99_ms": percentile(results["read"], 99) * 1000,
+        "errors": results["errors"],
+    }))
+
+
+def benchmark_sqlite(args) -> int:
+    """Compare the tuned SQLite profile with the default rollback-journal setup"""
+    profiles = {
+        "default journal": {"SQLITE_PERFORMANCE_PROFILE": "false"},
+        "WAL": {"SQLITE_PERFORMANCE_PROFILE": "true", "SQLITE_SINGLE_WRITER": "false"},
+        "WAL + single writer": {"SQLITE_PERFORMANCE_PROFILE": "true", "SQLITE_SINGLE_WRITER": "true"},
+    }
+    measurements = {}
+    for label, profile_env in profiles.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'concurrency.db')}",
+                **profile_env,
+            )
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_sqlite-probe",
+                 "--writers", str(args.writers), "--readers", str(args.readers),
+                 "--seconds", str(args.seconds), "--think-ms", str(args.think_ms)],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            measurements[label] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"SQLite, {args.writers} writer(s) / {args.readers} reader(s) for {args.seconds:.0f}s:")
+    for label, m in measurements.items():
+        print(f"   {label:<20} writes/s {m['writes_per_second']:8.1f}  reads/s {m['reads_per_second']:8.1f}  "
+              f"write p99 {m['write_p99_ms']:7.1f} ms  read p99 {m['read_p99_ms']:7.1f} ms  errors {m['errors']}")
+
+    tuned = measurements["WAL + single writer"]
+    if tuned["errors"]:
+        print(f"❌ {tuned['errors']} operation(s) failed with the tuned profile")
+        return 1
+    if args.max_read_p99_ms and tuned["read_p99_ms"] > args.max_read_p99_ms:
+        print(f"❌ Reader regression: p99 above {args.max_read_p99_ms:.0f} ms")
+        return 1
+    print("✅ SQLite profile within budget")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend performance benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    startup = subparsers.add_parser("startup", help="import-to-first-request time")
+    startup.add_argument("--runs", type=int, default=3)
+    startup.add_argument("--max-seconds", type=float, default=3.0)
+    startup.set_defaults(func=benchmark_startup)
+
+    login = subparsers.add_parser("login", help="concurrent /auth/login load")
+    login.add_argument("--requests", type=int, default=200)
+    login.add_argument("--concurrency", type=int, default=20)
+    # lookup + expired refresh-token prune + refresh-token insert
+    login.add_argument("--max-statements", type=float, default=3)
+    login.add_argument("--max-p99-ms", type=float, default=0, help="0 disables the latency check")
+    login.set_defaults(func=benchmark_login)
+
+    reads = subparsers.add_parser("reads", help="async vs sync read endpoint throughput")
+    reads.add_argument("--requests", type=int, default=2000)
+    reads.add_argument("--concurrency", type=int, default=50)
+    reads.add_argument("--threads", type=int, default=40)
+    reads.add_argument("--min-speedup", type=float, default=1.0)
+    reads.set_defaults(func=benchmark_reads)
+
+    explain = subparsers.add_parser("explain", help="fail if a hot endpoint's query plan scans a whole table or sorts a whole result for a page")
+    explain.add_argument("--students", type=int, default=5000)
+    explain.add_argument("--database-url", help="empty Postgres/SQLite database to use instead of a temp SQLite file")
+    explain.set_defaults(func=benchmark_explain)
+
+    attendance = subparsers.add_parser("attendance", help="bulk attendance round-trips and latency by roster size")
+    attendance.add_argument("--sizes", default="1,60,5000")
+    attendance.add_argument("--runs", type=int, default=5)
+    # pre-check + INSERT batches of 1000 rows (+ write-queue/session statements)
+    attendance.add_argument("--max-statements", type=int, default=10)
+    attendance.set_defaults(func=benchmark_attendance)
+
+    queries = subparsers.add_parser("queries", help="fail if listing endpoints issue per-row queries")
+    queries.add_argument("--page-sizes", default="1,10,100,500")
+    # page query + one selectin query per eager-loaded relationship
+    queries.add_argument("--max-statements", type=int, default=3)
+    queries.set_defaults(func=benchmark_queries)
+
+    pagination = subparsers.add_parser("pagination", help="first vs deep page, offset vs cursor, on a large attendance table")
+    pagination.add_argument("--rows", type=int, default=1000000)
+    pagination.add_argument("--page-size", type=int, default=100)
+    pagination.add_argument("--page", type=int, default=500)
+    pagination.add_argument("--repeat", type=int, default=5)
+    pagination.add_argument("--max-ratio", type=float, default=3.0)
+    pagination.set_defaults(func=benchmark_pagination)
+
+    data_stats = subparsers.add_parser("data-stats", help="/admin/data-stats latency on a large attendance table")
+    data_stats.add_argument("--rows", type=int, default=1000000)
+    data_stats.add_argument("--repeat", type=int, default=20)
+    data_stats.add_argument("--max-ms", type=float, default=5.0)
+    data_stats.set_defaults(func=benchmark_data_stats)
+
+    serialize = subparsers.add_parser("serialize", help="nested list serialization, response_model vs projection")
+    serialize.add_argument("--results", type=int, default=10000)
+    serialize.add_argument("--repeat", type=int, default=5)
+    serialize.add_argument("--min-speedup", type=float, default=2.0)
+    serialize.set_defaults(func=benchmark_serialize)
+
+    compression = subparsers.add_parser("compression", help="response size and latency with gzip/br vs identity")
+    compression.add_argument("--rows", type=int, default=500)
+    compression.add_argument("--repeat", type=int, default=20)
+    compression.add_argument("--max-ratio", type=float, default=0.3)
+    compression.set_defaults(func=benchmark_compression)
+
+    sqlite = subparsers.add_parser("sqlite", help="concurrent SQLite readers/writers, tuned vs default profile")
+    sqlite_probe = subparsers.add_parser("_sqlite-probe")
+    for sub in (sqlite, sqlite_probe):
+        sub.add_argument("--writers", type=int, default=8)
+        sub.add_argument("--readers", type=int, default=8)
+        sub.add_argument("--seconds", type=float, default=5)
+        sub.add_argument("--think-ms", type=float, default=2)
+    sqlite.add_argument("--max-read-p99-ms", type=float, default=0, help="0 disables the latency check")
+    sqlite.set_defaults(func=benchmark_sqlite)
+    sqlite_probe.set_defaults(func=run_sqlite_probe)
+
+    probe = subparsers.add_parser("_startup-probe")
+    probe.set_defaults(func=lambda args: run_startup_probe())
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a fixed TTL.
+
+    Each API worker process holds its own instance, so the TTL is also the upper
+    bound on how long another worker can serve a stale entry after an
+    invalidation in this one.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value; ttl (capped at the cache's own TTL) shortens the lifetime of this entry"""
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + lifetime)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Authenticated principals keyed by username (see get_current_user in main.py)
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 1024)),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60)),
+)
+
+# Dashboard and data-statistics counters; dropped on writes to the counted tables,
+# so the TTL only bounds staleness across worker processes
+stats_cache = TTLCache(
+    maxsize=32,
+    ttl=float(os.getenv("STATS_CACHE_TTL_SECONDS", 10)),
+)
+
+# Pre-serialized bodies of the unauthenticated /public endpoints; dropped on writes
+# to their tables and never kept past the next notice expiry
+public_cache = TTLCache(
+    maxsize=16,
+    ttl=float(os.getenv("PUBLIC_CACHE_TTL_SECONDS", 300)),
+)
@@ -0,0 +1,172 @@
+import gzip
+import os
+import zlib
+from typing import Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this go out as they are: below about one packet compression saves
+# no round trips and costs CPU on both ends
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+# Cached bodies are compressed once per rebuild, so they can afford a slower, denser setting
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The supported encoding the client prefers (br over gzip on a tie), or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """A strong ETag names exact bytes, so each encoding gets its own ("abc" -> "abc-gzip").
+    Weak ETags are left alone."""
+    if not encoding or etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def cached_variant(variants: dict, body: bytes, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+    """(encoding, bytes) of a cached body for this client; each encoding is compressed once and
+    kept in `variants`, which lives as long as the cache entry"""
+    encoding = negotiate(accept_encoding) if len(body) >= COMPRESSION_MIN_SIZE else None
+    if encoding is None:
+        return None, body
+    data = variants.get(encoding)
+    if data is None:
+        data = variants[encoding] = compress(body, encoding, cached=True)
+    return encoding, data
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """Compress JSON/text responses of at least COMPRESSION_MIN_SIZE bytes with br or gzip.
+
+    Responses that already carry a Content-Encoding (such as pre-compressed cache entries)
+    pass through untouched. Streaming bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None  # (compress, flush) once a streamed body is being compressed
+
+        async def send_compressed(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if stream is not None:
+                compress_chunk, flush = stream
+                data = compress_chunk(message.get("body", b""))
+                if not message.get("more_body", False):
+                    data += flush()
+                await send({"type": "http.response.body", "body": data, "more_body": message.get("more_body", False)})
+                return
+            if start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start["headers"] = list(start.get("headers", []))
+            headers = MutableHeaders(raw=start["headers"])
+            initial, start = start, None
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or initial["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                await send(initial)
+                await send(message)
+                return
+
+            if more_body:
+                stream = _compressor(encoding)
+                data = stream[0](body)
+            else:
+                data = compress(body, encoding)
+                if len(data) >= len(body):
+                    await send(initial)
+                    await send(message)
+                    return
+
+            headers.add_vary_header("Accept-Encoding")
+            headers["Content-Encoding"] = encoding
+            if "etag" in headers:
+                headers["ETag"] = variant_etag(headers["etag"], encoding)
+            if more_body:
+                del headers["content-length"]
+            else:
+                headers["Content-Length"] = str(len(data))
+            await send(initial)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
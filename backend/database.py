@@ -1,35 +1,512 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+import functools
+import hashlib
 import os
-from sqlalchemy import text
+import sqlite3
+import threading
+import time
+from collections import deque
+from sqlalchemy import text, inspect, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from dotenv import load_dotenv
+from fastapi import Request
 
 # Load environment variables first
 load_dotenv()
 
 # Import models to ensure they're registered with SQLModel
 from models import *
+from cache import TTLCache
+from log import get_logger
+
+logger = get_logger("database")
 
 # Database URL (SQLite for development, can be changed to PostgreSQL/MySQL for production)
 DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///./coaching_center.db"
 
+# Optional read replica for read-only endpoints (see get_read_session)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
 # Replace postgresql:// with postgresql+psycopg://
-if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+def normalize_database_url(url: str) -> str:
+    if url and url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+DATABASE_URL = normalize_database_url(DATABASE_URL)
+DATABASE_READ_URL = normalize_database_url(DATABASE_READ_URL)
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_POSTGRES = DATABASE_URL.startswith("postgresql")
+
+# Connection pool settings (all overridable via environment)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5 if IS_SQLITE else 10))
+# Sync handlers and their session dependencies share Starlette's threadpool (40
+# threads). With fewer connections than threads, threads blocked in checkout can
+# starve the teardown that would return a connection, so capacity defaults to 40.
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", max(0, 40 - DB_POOL_SIZE)))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "false" if IS_SQLITE else "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+# How long SQLite waits on a locked database before raising "database is locked"
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", 15))
+
+# SQLite performance profile: WAL + tuned pragmas + a single in-process writer
+SQLITE_PERFORMANCE_PROFILE = _env_flag("SQLITE_PERFORMANCE_PROFILE", "true")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+SQLITE_SINGLE_WRITER = SQLITE_PERFORMANCE_PROFILE and _env_flag("SQLITE_SINGLE_WRITER", "true")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def telemetry(self) -> dict:
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(0, self.overflow()),
+                "timeout_seconds": self._timeout,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Asyncio-compatible InstrumentedQueuePool, used by the async engine"""
+
+
+def build_engine_options(url: str) -> dict:
+    """Engine keyword arguments for the given database URL"""
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT}}
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            return options
+    else:
+        options = {"connect_args": {}}
+        if url.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS > 0:
+            options["connect_args"]["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        options["pool_recycle"] = DB_POOL_RECYCLE
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Switch every new SQLite connection to WAL with the tuned pragmas"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def make_engine(url: str):
+    new_engine = create_engine(url, echo=False, **build_engine_options(url))
+    if url.startswith("sqlite") and SQLITE_PERFORMANCE_PROFILE:
+        event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+
+# Async engines (aiosqlite / psycopg async) back the async read endpoints
+def to_async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    # postgresql+psycopg serves both sync and async engines
+    return url
+
+def make_async_engine(url: str):
+    options = build_engine_options(url)
+    if options.get("poolclass") is InstrumentedQueuePool:
+        options["poolclass"] = InstrumentedAsyncQueuePool
+    new_engine = create_async_engine(to_async_url(url), echo=False, **options)
+    if url.startswith("sqlite") and SQLITE_PERFORMANCE_PROFILE:
+        event.listen(new_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+async_engine = make_async_engine(DATABASE_URL)
+async_read_engine = make_async_engine(DATABASE_READ_URL) if DATABASE_READ_URL else async_engine
+
+
+class WriterQueue:
+    """FIFO hand-off lock that lets one write transaction at a time reach SQLite.
+
+    SQLite allows a single writer; letting sessions race for the file lock
+    produces busy-wait stalls and "database is locked" errors. Writers queue
+    here instead, in arrival order, while WAL keeps readers unblocked. A
+    writer that waits longer than the busy timeout proceeds unqueued and is
+    left to SQLite's own locking.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._busy = False
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_seconds_max = 0.0
+
+    def acquire(self) -> bool:
+        started = time.perf_counter()
+        with self._lock:
+            if not self._busy and not self._waiters:
+                self._busy = True
+                self.acquired += 1
+                return True
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+
+        granted = waiter.wait(self.timeout)
+        with self._lock:
+            if not granted and not waiter.is_set():
+                self._waiters.remove(waiter)
+                self.timeouts += 1
+                return False
+            self.acquired += 1
+            self.wait_seconds_max = max(self.wait_seconds_max, time.perf_counter() - started)
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the next writer so nobody can barge in
+                self._waiters.popleft().set()
+            else:
+                self._busy = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "busy": self._busy,
+                "waiting": len(self._waiters),
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+sqlite_writer_queue = WriterQueue(timeout=SQLITE_BUSY_TIMEOUT) if IS_SQLITE and SQLITE_SINGLE_WRITER else None
+
+
+# Statements that never take SQLite's write lock. Anything else queues for the writer slot,
+# including textual DML (text("UPDATE ...") / exec_driver_sql), whose execution context
+# has none of the isinsert/isupdate/isdelete flags set, and DDL.
+READ_ONLY_VERBS = ("SELECT", "PRAGMA", "EXPLAIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+
+def _is_write(statement: str, context) -> bool:
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        return True
+    return not statement.lstrip()[:9].upper().startswith(READ_ONLY_VERBS)
+
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL and "sqlite" in DATABASE_URL else {},
-    echo=False
-)
+if sqlite_writer_queue is not None:
+    # The slot is taken by the first write statement on a connection and held
+    # until the connection goes back to the pool, i.e. after COMMIT/ROLLBACK
+    @event.listens_for(engine, "before_cursor_execute")
+    def _queue_write(conn, cursor, statement, parameters, context, executemany):
+        info = conn.info
+        if info.get("holds_writer") or info.get("writer_bypass"):
+            return
+        if not _is_write(statement, context):
+            return
+        if sqlite_writer_queue.acquire():
+            info["holds_writer"] = True
+        else:
+            info["writer_bypass"] = True
+
+    @event.listens_for(engine, "checkin")
+    def _release_writer(dbapi_connection, connection_record):
+        connection_record.info.pop("writer_bypass", None)
+        if connection_record.info.pop("holds_writer", False):
+            sqlite_writer_queue.release()
+
+
+# Committed writes, by table, for in-process caches derived from table contents.
+# Listeners get a set of table names; None in the set means "unknown, assume any".
+table_change_listeners = []
+
+def on_table_change(callback):
+    table_change_listeners.append(callback)
+    return callback
+
+@event.listens_for(engine, "after_cursor_execute")
+def _track_written_tables(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        table = getattr(context.compiled.statement, "table", None)
+        conn.info.setdefault("written_tables", set()).add(getattr(table, "name", None))
+    elif statement.lstrip()[:7].upper().startswith(("INSERT", "UPDATE", "DELETE", "REPLACE")):
+        conn.info.setdefault("written_tables", set()).add(None)
+
+def _notify_table_change(tables):
+    for callback in table_change_listeners:
+        callback(tables)
+
+# The commit event fires just before COMMIT reaches the database, so a concurrent reader
+# can still see the old rows after listeners ran. The tables are published again when the
+# connection returns to the pool, after the commit is visible, so anything rebuilt from
+# the old rows in between (a cache entry, a version-based ETag) is superseded.
+@event.listens_for(engine, "commit")
+def _publish_written_tables(conn):
+    tables = conn.info.pop("written_tables", None)
+    if tables:
+        conn.info.setdefault("committed_tables", set()).update(tables)
+        _notify_table_change(tables)
+
+@event.listens_for(engine, "checkin")
+def _republish_committed_tables(dbapi_connection, connection_record):
+    tables = connection_record.info.pop("committed_tables", None)
+    if tables:
+        _notify_table_change(tables)
+
+@event.listens_for(engine, "rollback")
+def _discard_written_tables(conn):
+    conn.info.pop("written_tables", None)
+
+
+# INSERT construct with on_conflict_do_update()/on_conflict_do_nothing() for the configured backend
+# Bind parameters one statement may carry; multi-row VALUES statements and IN lists are
+# split to stay below it. SQLite's limit is a build setting (999 before 3.32, 32766 after,
+# higher in some distributions), read from a connection where Python exposes it (3.11+);
+# PostgreSQL's wire protocol allows 65535.
+SQLITE_DEFAULT_MAX_VARIABLES = 999
+
+@functools.lru_cache(maxsize=None)
+def max_bind_parameters() -> int:
+    if not IS_SQLITE:
+        return 65535
+    with engine.connect() as conn:
+        getlimit = getattr(conn.connection.dbapi_connection, "getlimit", None)
+        if getlimit is None:
+            return SQLITE_DEFAULT_MAX_VARIABLES
+        return getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+def upsert_insert(model):
+    if IS_POSTGRES:
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+def describe_pool(pool) -> dict:
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.telemetry()
+    return {"pool_class": type(pool).__name__, "status": pool.status()}
+
+def get_pool_stats() -> dict:
+    """Checked-out, overflow and checkout wait-time figures for the engine's pool"""
+    stats = describe_pool(engine.pool)
+    if sqlite_writer_queue is not None:
+        stats["sqlite_writer_queue"] = sqlite_writer_queue.stats()
+    stats["async"] = describe_pool(async_engine.pool)
+    if read_engine is not engine:
+        stats["read_replica"] = describe_pool(read_engine.pool)
+        stats["async_read_replica"] = describe_pool(async_read_engine.pool)
+        stats["read_your_writes"] = recent_writers.stats()
+    return stats
+
+# Clients that recently sent a mutating request read from the primary for this
+# many seconds, so they see their own writes even while the replica lags.
+# Tracked per API process, like the other in-process caches.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+recent_writers = TTLCache(maxsize=10000, ttl=READ_YOUR_WRITES_SECONDS)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+def client_key(request: Request) -> str:
+    """Identify the caller by bearer token, falling back to the client address"""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return request.client.host if request.client else "anonymous"
 
-# Dependency to get DB session
-def get_session():
+# Dependency to get a DB session on the primary (all writes go through here)
+def get_write_session(request: Request):
+    if read_engine is not engine and request.method not in SAFE_METHODS:
+        # Marked up front: cleanup after yield only runs once the response is sent
+        recent_writers.set(client_key(request), True)
     with Session(engine) as session:
         yield session
 
+# Existing handlers depend on get_session; it is the primary/write session
+get_session = get_write_session
+
+# Dependency to get a DB session for read-only endpoints (replica when configured)
+def get_read_session(request: Request):
+    bind = read_engine
+    if read_engine is not engine and recent_writers.get(client_key(request)):
+        bind = engine
+    with Session(bind) as session:
+        yield session
+
+# Dependency to get an AsyncSession for async read-only endpoints (same routing as get_read_session)
+async def get_async_session(request: Request):
+    bind = async_read_engine
+    if async_read_engine is not async_engine and recent_writers.get(client_key(request)):
+        bind = async_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+# Dependencies for reads that refill in-process caches or back version-based ETags.
+# Those are invalidated when the primary commits, so they must be rebuilt from the
+# primary: a lagging replica would put the old rows back under a fresh entry.
+def get_primary_read_session():
+    with Session(engine) as session:
+        yield session
+
+async def get_async_primary_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
 # Function to create all tables
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    upgrade_schema()
+
+# SQL that fills a newly added column for rows written before it existed
+COLUMN_BACKFILLS = {
+    ("attendances", "attendance_day"): {
+        "sqlite": "UPDATE attendances SET attendance_day = DATE(date) WHERE attendance_day IS NULL",
+        "default": "UPDATE attendances SET attendance_day = CAST(date AS DATE) WHERE attendance_day IS NULL",
+    },
+}
+
+# SQL listing the rows that would violate a unique index about to be created on an
+# existing table. Startup never deletes them: it stops and names them instead, and
+# dedupe_attendance.py resolves them explicitly (with a backup of what it removes).
+INDEX_CONFLICTS = {
+    "ux_attendances_student_class_day": (
+        "SELECT a.id, a.student_id, a.class_id, a.attendance_day, a.status FROM attendances a "
+        "WHERE EXISTS (SELECT 1 FROM attendances b WHERE b.student_id = a.student_id "
+        "AND b.class_id = a.class_id AND b.attendance_day = a.attendance_day AND b.id <> a.id) "
+        "ORDER BY a.student_id, a.class_id, a.attendance_day, a.id"
+    ),
+}
+
+class SchemaUpgradeError(RuntimeError):
+    """Existing rows block a schema change; they must be resolved by hand before startup"""
+
+# Indexes replaced by a newer definition, dropped once the replacement exists
+SUPERSEDED_INDEXES = {
+    "attendances": ["ix_attendances_student_class_day", "ix_attendances_class_day"],
+}
+
+# Function to bring existing tables in line with the models
+def upgrade_schema():
+    """Add columns and indexes that the models declare but existing tables lack.
+    create_all() only creates missing tables, so databases created by an older
+    version of the app are upgraded here in place.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    blocked = []
+
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                logger.info("Added column", extra={"table": table.name, "column": column.name})
+
+                backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    sql = backfill.get(engine.dialect.name, backfill["default"])
+                    updated = conn.execute(text(sql)).rowcount
+                    logger.info("Backfilled column", extra={"table": table.name, "column": column.name, "rows": updated})
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            table_blocked = False
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    conflicts = INDEX_CONFLICTS.get(index.name)
+                    rows = conn.execute(text(conflicts)).all() if conflicts else []
+                    if rows:
+                        blocked.append((table.name, index.name, rows))
+                        table_blocked = True
+                        continue
+                    index.create(conn)
+                    logger.info("Created index", extra={"table": table.name, "index": index.name})
+            
+            if table_blocked:
+                continue  # keep the indexes the missing ones would replace
+            for name in SUPERSEDED_INDEXES.get(table.name, []):
+                if name in existing_indexes:
+                    conn.execute(text(f"DROP INDEX {name}"))
+                    logger.info("Dropped superseded index", extra={"table": table.name, "index": name})
+
+    # Raised after the commit above, so added columns and backfills are kept
+    if blocked:
+        lines = []
+        for table_name, index_name, rows in blocked:
+            lines.append(f"{len(rows)} row(s) in {table_name} conflict with unique index {index_name}:")
+            lines.extend(f"    {dict(row._mapping)}" for row in rows[:20])
+            if len(rows) > 20:
+                lines.append(f"    ... and {len(rows) - 20} more")
+        lines.append("Resolve them (see dedupe_attendance.py) and restart.")
+        message = "\n".join(lines)
+        logger.error("Schema upgrade blocked", extra={"details": message})
+        raise SchemaUpgradeError(message)
 
 # Function to reset database (drop all tables and recreate)
 def reset_database():
@@ -72,6 +549,7 @@ def reset_database():
             DROP TABLE IF EXISTS classes CASCADE;
             DROP TABLE IF EXISTS admission_requests CASCADE;
             DROP TABLE IF EXISTS admin_creation_codes CASCADE;
+            DROP TABLE IF EXISTS refresh_tokens CASCADE;
             DROP TABLE IF EXISTS users CASCADE;
             """
 
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Resolve duplicate attendance marks (same student, class and day) so the unique
+index ux_attendances_student_class_day can be created. Startup refuses to run
+while such duplicates exist.
+
+    python dedupe_attendance.py            # list what would be removed
+    python dedupe_attendance.py --apply    # remove it, after writing a JSON backup
+
+For every duplicated (student, class, day) the most recent mark (highest id) is kept.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from database import engine, create_db_and_tables, SchemaUpgradeError
+from log import get_logger
+from models import Attendance
+
+logger = get_logger("dedupe_attendance")
+
+
+def find_duplicates(session: Session) -> list:
+    """Attendance rows that are not the newest mark of their (student, class, day)"""
+    newest = select(func.max(Attendance.id)).group_by(
+        Attendance.student_id, Attendance.class_id, Attendance.attendance_day
+    )
+    statement = select(Attendance).where(Attendance.id.not_in(newest)).order_by(
+        Attendance.student_id, Attendance.class_id, Attendance.attendance_day, Attendance.id
+    )
+    return session.exec(statement).all()
+
+
+def dedupe_attendance(apply: bool, backup_path: str) -> int:
+    try:
+        # Adds and backfills attendance_day on older databases; the blocked index is expected
+        create_db_and_tables()
+    except SchemaUpgradeError:
+        pass
+
+    with Session(engine) as session:
+        duplicates = find_duplicates(session)
+        if not duplicates:
+            logger.info("No duplicate attendance marks")
+            return 0
+
+        logger.info("Found duplicate attendance marks (older marks of the same student, class and day)",
+                    extra={"count": len(duplicates)})
+        for row in duplicates:
+            logger.info("Duplicate attendance mark", extra={
+                "attendance_id": row.id, "student_id": row.student_id, "class_id": row.class_id,
+                "attendance_day": row.attendance_day, "status": row.status, "marked": row.date,
+            })
+
+        if not apply:
+            logger.info("Nothing changed. Re-run with --apply to remove them.")
+            return 0
+
+        with open(backup_path, "w") as backup:
+            json.dump([row.model_dump(mode="json") for row in duplicates], backup, indent=2)
+        logger.info("Backed up duplicate attendance marks", extra={"count": len(duplicates), "path": backup_path})
+
+        ids = [row.id for row in duplicates]
+        for first in range(0, len(ids), 500):
+            session.exec(delete(Attendance).where(Attendance.id.in_(ids[first:first + 500])))
+        session.commit()
+        logger.info("Removed duplicate attendance marks", extra={"count": len(duplicates)})
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate attendance marks")
+    parser.add_argument("--apply", action="store_true", help="delete the duplicates (default: only list them)")
+    parser.add_argument(
+        "--backup",
+        default=f"attendance_duplicates_{datetime.utcnow():%Y%m%d%H%M%S}.json",
+        help="where to write the removed rows",
+    )
+    args = parser.parse_args()
+    sys.exit(dedupe_attendance(args.apply, args.backup))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,43 @@
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
-from sqlalchemy import func, or_, and_
-from sqlalchemy.orm import selectinload
-from database import get_session, create_db_and_tables, engine
+from sqlalchemy import func, or_, and_, update, delete, case, insert, literal_column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, joinedload, make_transient_to_detached
+from database import get_session, get_read_session, get_async_session, get_primary_read_session, get_async_primary_session, create_db_and_tables, engine, get_pool_stats, upsert_insert, max_bind_parameters, on_table_change, IS_POSTGRES
+from sqlmodel.ext.asyncio.session import AsyncSession
+from cache import principal_cache, stats_cache, public_cache
+from passwords import password_service
+from log import get_logger, RequestIdMiddleware, logging_stats
+from pagination import CursorPage, PageParams, DateRange, paginate, page_statement, page_response
+from stats import CountRefresher, count_rows, estimate_row_counts
+from versions import entity_versions, etag_matches
+from projections import Projection
+from compression import CompressionMiddleware, SUPPORTED_ENCODINGS, cached_variant, variant_etag
 from models import *
 from schemas import *
 from schemas import PasswordChangeRequest
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import uvicorn
-from typing import List, Optional
+import secrets
+from typing import List, Optional, Union
+from pydantic import TypeAdapter
 import os
+import time
+import hashlib
+import logging
 import shutil
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = get_logger("api")
+
 def parse_datetime_field(value, field_name):
     """Helper function to parse datetime fields from string to datetime object"""
     if isinstance(value, str):
@@ -30,18 +48,15 @@ def parse_datetime_field(value, field_name):
             # Parse ISO format date string to datetime
             return datetime.fromisoformat(value)
         except (ValueError, AttributeError) as e:
-            print(f"Error parsing {field_name}: {e}")
+            logger.warning("Could not parse %s: %s", field_name, e)
             return None
     return value
-from mock_data import *
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")  # Default algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))  # Default 30 minutes
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 720))  # Default 12 hours (a school day)
 REMEMBER_ME_TOKEN_EXPIRE_MINUTES = int(os.getenv("REMEMBER_ME_TOKEN_EXPIRE_MINUTES", 21600))  # 15 days = 21,600 minutes
 
 # File upload settings
@@ -54,12 +69,16 @@ security = HTTPBearer()
 app = FastAPI(
     title="Coaching Center Management System",
     description="A comprehensive management system for coaching centers",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure for large file uploads
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
+# Compress large JSON/text responses (br when available, else gzip); see compression.py
+app.add_middleware(CompressionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -69,10 +88,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so every response (CORS preflights included) carries X-Request-ID
+app.add_middleware(RequestIdMiddleware)
+
 # Create tables on startup
 @app.on_event("startup")
 def startup_event():
     create_db_and_tables()
+    data_stats_refresher.start()
     
     # Initialize default admin creation code if it doesn't exist
     session = Session(engine)
@@ -85,18 +108,25 @@ def startup_event():
             default_code = AdminCreationCode(code="illusion", is_active=True)
             session.add(default_code)
             session.commit()
-            print("Default admin creation code 'illusion' initialized")
-    except Exception as e:
-        print(f"Error initializing default admin creation code: {e}")
+            logger.info("Default admin creation code initialized")
+    except Exception:
+        logger.exception("Error initializing default admin creation code")
     finally:
         session.close()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    data_stats_refresher.stop()
+    password_service.shutdown()
+
 # Utility functions
+# bcrypt runs in the password service's process pool; these block the calling
+# (threadpool) thread only while waiting, and raise 503 when the pool is saturated.
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_service.hash_sync(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_service.verify_sync(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -108,7 +138,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), session: Session = Depends(get_session)) -> User:
+# User columns kept in the principal cache. password_hash is deliberately left out;
+# the few routes that need it lazy-load it from the database.
+PRINCIPAL_CACHE_FIELDS = (
+    "id", "username", "email", "full_name", "phone",
+    "photo_path", "photo_url", "role", "is_active", "token_version", "created_at"
+)
+
+def load_principal(username: str, session: Session) -> Optional[User]:
+    """Resolve a username to a session-bound User, using the principal cache when possible"""
+    cached = principal_cache.get(username)
+    if cached is None:
+        user = session.exec(select(User).where(User.username == username)).first()
+        if user is not None:
+            principal_cache.set(username, {field: getattr(user, field) for field in PRINCIPAL_CACHE_FIELDS})
+        return user
+    
+    # Re-attach the cached snapshot as a persistent instance without querying
+    user = User(**cached)
+    make_transient_to_detached(user)
+    return session.merge(user, load=False)
+
+def build_token_claims(user: User, user_data: dict) -> dict:
+    """Build the role and ownership claims embedded in a user's access token"""
+    claims = {
+        "sub": user.username,
+        "uid": user.id,
+        "role": user.role,
+        "tv": user.token_version or 0,
+    }
+    for key in ("student_id", "teacher_id", "class_id"):
+        if user_data.get(key) is not None:
+            claims[key] = user_data[key]
+    return claims
+
+def revoke_access_tokens(user: User) -> None:
+    """Invalidate every access token issued to the user (e.g. when its claims go stale)"""
+    user.token_version = (user.token_version or 0) + 1
+
+def issue_refresh_token(user: User, expires_at: datetime, session: Session) -> str:
+    """Record a new refresh token for the user and return its signed form.
+    The caller commits the session.
+    """
+    jti = secrets.token_urlsafe(32)
+    session.add(RefreshToken(jti=jti, user_id=user.id, expires_at=expires_at))
+    return jwt.encode(
+        {"sub": user.username, "uid": user.id, "jti": jti, "typ": "refresh", "exp": expires_at},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+def revoke_refresh_tokens(user_id: int, session: Session) -> None:
+    """Revoke every outstanding refresh token of a user. The caller commits the session."""
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+# async: decoding is CPU-only, so it runs on the event loop instead of taking a threadpool slot
+async def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenClaims:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -117,14 +206,23 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        # Refresh tokens are only accepted by /auth/refresh
+        if payload.get("sub") is None or payload.get("typ") == "refresh":
             raise credentials_exception
-    except JWTError:
+        return TokenClaims(**payload)
+    except (JWTError, ValueError):
         raise credentials_exception
+
+def get_current_user(claims: TokenClaims = Depends(get_token_claims), session: Session = Depends(get_session)) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     
-    user = session.exec(select(User).where(User.username == username)).first()
-    if user is None:
+    user = load_principal(claims.sub, session)
+    # A token whose version lags the user's has been revoked
+    if user is None or claims.tv != (user.token_version or 0):
         raise credentials_exception
     return user
 
@@ -133,6 +231,76 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+# Async variants for async endpoints: no threadpool hop, database I/O on the AsyncSession.
+# The User they return is a detached snapshot; only its columns may be used. Like the
+# sync path they read the primary: whatever is read fills the shared principal_cache, and
+# a lagging replica would re-cache a user just deactivated or revoked by someone else.
+async def load_principal_async(username: str, session: AsyncSession) -> Optional[User]:
+    """Async counterpart of load_principal"""
+    cached = principal_cache.get(username)
+    if cached is not None:
+        return User(**cached)
+    user = (await session.exec(select(User).where(User.username == username))).first()
+    if user is not None:
+        principal_cache.set(username, {field: getattr(user, field) for field in PRINCIPAL_CACHE_FIELDS})
+    return user
+
+async def get_current_user_async(claims: TokenClaims = Depends(get_token_claims), session: AsyncSession = Depends(get_async_primary_session)) -> User:
+    user = await load_principal_async(claims.sub, session)
+    # A token whose version lags the user's has been revoked
+    if user is None or claims.tv != (user.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+async def get_current_active_user_async(current_user: User = Depends(get_current_user_async)) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+async def require_teacher_or_admin_async(current_user: User = Depends(get_current_active_user_async)) -> User:
+    if current_user.role not in [UserRole.TEACHER, UserRole.ADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Teacher or Admin access required"
+        )
+    return current_user
+
+# Conditional GET: the ETag comes from the version counters of the tables behind the
+# response, so a matching If-None-Match is answered with 304 before any query runs.
+# Counters move when the primary commits, so these endpoints read the primary
+# (get_async_primary_session): a replica body could lag the version it is tagged with.
+on_table_change(entity_versions.bump)
+
+def conditional_get(*models, authenticated: bool = True):
+    """Dependency that answers 304 when the client's copy is current, or sets ETag on the response.
+
+    Declare it after the endpoint's auth dependencies. The validator covers the principal,
+    path and query string, and is keyed per process, so a client can only hold a matching
+    one if it was served this response (past the endpoint's access checks) before.
+    """
+    tables = frozenset(model.__tablename__ for model in models)
+    
+    def check(request: Request, response: Response, principal_id: Optional[int]) -> str:
+        etag = entity_versions.etag(tables, principal_id, request.url.path, request.url.query)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+    
+    if authenticated:
+        async def dependency(request: Request, response: Response,
+                             current_user: User = Depends(get_current_active_user_async)) -> str:
+            return check(request, response, current_user.id)
+    else:
+        async def dependency(request: Request, response: Response) -> str:
+            return check(request, response, None)
+    return dependency
+
 # Role-based authorization dependencies
 def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
     if current_user.role != UserRole.ADMIN:
@@ -174,7 +342,30 @@ def require_student_or_teacher(current_user: User = Depends(get_current_active_u
         )
     return current_user
 
-def validate_student_access(student_id: int, current_user: User, session: Session) -> User:
+def is_own_student_record(student_id: int, current_user: User, session: Session, claims: Optional[TokenClaims] = None) -> bool:
+    """Check whether student_id belongs to the current user, from token claims when available"""
+    if claims is not None and claims.student_id is not None:
+        return claims.student_id == student_id
+    student = session.get(Student, student_id)
+    return bool(student and student.user_id == current_user.id)
+
+def is_own_teacher_record(teacher_id: int, current_user: User, session: Session, claims: Optional[TokenClaims] = None) -> bool:
+    """Check whether teacher_id belongs to the current user, from token claims when available"""
+    if claims is not None and claims.teacher_id is not None:
+        return claims.teacher_id == teacher_id
+    teacher = session.get(Teacher, teacher_id)
+    return bool(teacher and teacher.user_id == current_user.id)
+
+def get_student_class_id(student_id: int, session: Session, claims: Optional[TokenClaims] = None) -> int:
+    """Resolve a student's class, skipping the lookup when it is the caller's own record"""
+    if claims is not None and claims.student_id == student_id and claims.class_id is not None:
+        return claims.class_id
+    student = session.get(Student, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student.class_id
+
+def validate_student_access(student_id: int, current_user: User, session: Session, claims: Optional[TokenClaims] = None) -> User:
     """Validate that the current user can access the specified student's data"""
     if current_user.role == UserRole.ADMIN:
         return current_user  # Admins can access any student data
@@ -182,8 +373,7 @@ def validate_student_access(student_id: int, current_user: User, session: Sessio
         return current_user  # Teachers can access any student data (for now)
     elif current_user.role == UserRole.STUDENT:
         # Students can only access their own data
-        student = session.get(Student, student_id)
-        if not student or student.user_id != current_user.id:
+        if not is_own_student_record(student_id, current_user, session, claims):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. You can only view your own data."
@@ -195,6 +385,55 @@ def validate_student_access(student_id: int, current_user: User, session: Sessio
             detail="Access denied"
         )
 
+# The access rules above are shared with async endpoints through run_sync
+async def validate_student_access_async(student_id: int, current_user: User, session: AsyncSession, claims: Optional[TokenClaims] = None) -> User:
+    return await session.run_sync(lambda sync_session: validate_student_access(student_id, current_user, sync_session, claims))
+
+async def get_student_class_id_async(student_id: int, session: AsyncSession, claims: Optional[TokenClaims] = None) -> int:
+    return await session.run_sync(lambda sync_session: get_student_class_id(student_id, sync_session, claims))
+
+async def is_own_teacher_record_async(teacher_id: int, current_user: User, session: AsyncSession, claims: Optional[TokenClaims] = None) -> bool:
+    return await session.run_sync(lambda sync_session: is_own_teacher_record(teacher_id, current_user, sync_session, claims))
+
+# Eager-load options covering every relationship the *Read response models serialize.
+# Async endpoints cannot lazy-load, so these must follow changes to those models.
+SUBJECT_READ_OPTIONS = (selectinload(Subject.class_assigned),)
+STUDENT_READ_OPTIONS = (selectinload(Student.user), selectinload(Student.class_assigned))
+TEACHER_READ_OPTIONS = (selectinload(Teacher.user),)
+EXAM_READ_OPTIONS = (
+    selectinload(Exam.subject).selectinload(Subject.class_assigned),
+    selectinload(Exam.class_assigned),
+)
+EXAM_RESULT_READ_OPTIONS = (
+    selectinload(ExamResult.exam).selectinload(Exam.subject).selectinload(Subject.class_assigned),
+    selectinload(ExamResult.exam).selectinload(Exam.class_assigned),
+    selectinload(ExamResult.student).selectinload(Student.user),
+    selectinload(ExamResult.student).selectinload(Student.class_assigned),
+)
+STUDY_MATERIAL_READ_OPTIONS = (selectinload(StudyMaterial.subject).selectinload(Subject.class_assigned),)
+CLASS_SCHEDULE_READ_OPTIONS = (
+    selectinload(ClassSchedule.subject).selectinload(Subject.class_assigned),
+    selectinload(ClassSchedule.class_assigned),
+    selectinload(ClassSchedule.teacher).selectinload(Teacher.user),
+)
+
+# Column projections for the largest listings: one joined query, rows serialized by
+# orjson without the response_model validation pass (see projections.py)
+STUDENT_PROJECTION = Projection(
+    StudentRead, Student,
+    user=Projection(UserRead, User),
+    class_assigned=Projection(ClassRead, Class),
+)
+EXAM_RESULT_PROJECTION = Projection(
+    ExamResultRead, ExamResult,
+    exam=Projection(
+        ExamRead, Exam,
+        subject=Projection(SubjectRead, Subject, class_assigned=Projection(ClassRead, Class)),
+        class_assigned=Projection(ClassRead, Class),
+    ),
+    student=STUDENT_PROJECTION,
+)
+
 def generate_roll_number_for_class(class_id: int, session: Session) -> str:
     """Generate a unique roll number for a student in a specific class"""
     # Find the next available roll number for this class
@@ -312,8 +551,8 @@ def health_check():
 
 # Authentication endpoints
 @app.post("/auth/login", response_model=LoginResponse, tags=["Authentication"])
-def login(login_data: LoginRequest, session: Session = Depends(get_session)):
-    user = authenticate_user(login_data.username, login_data.password, session)
+async def login(login_data: LoginRequest, session: Session = Depends(get_session)):
+    user = await authenticate_user(login_data.username, login_data.password, session)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -321,17 +560,43 @@ def login(login_data: LoginRequest, session: Session = Depends(get_session)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Set token expiration based on remember_me parameter
+    # Access tokens are always short-lived; remember_me extends the refresh token's lifetime
     if login_data.remember_me:
-        access_token_expires = timedelta(minutes=REMEMBER_ME_TOKEN_EXPIRE_MINUTES)
+        refresh_token_expires = timedelta(minutes=REMEMBER_ME_TOKEN_EXPIRE_MINUTES)
     else:
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        refresh_token_expires = timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
     
+    # Role data was eager-loaded by authenticate_user, so this touches no database
+    user_data = get_login_user_data(user)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=build_token_claims(user, user_data),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    refresh_token = await run_in_threadpool(
+        start_refresh_session, user, datetime.utcnow() + refresh_token_expires, session
     )
     
-    # Get additional user data based on role
+    return {
+        "access_token": access_token, 
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "user": user_data
+    }
+
+def start_refresh_session(user: User, expires_at: datetime, session: Session) -> str:
+    """Issue the refresh token for a new login, pruning the user's expired ones"""
+    session.exec(
+        delete(RefreshToken).where(
+            RefreshToken.user_id == user.id,
+            RefreshToken.expires_at < datetime.utcnow()
+        )
+    )
+    refresh_token = issue_refresh_token(user, expires_at, session)
+    session.commit()
+    return refresh_token
+
+def get_login_user_data(user: User) -> dict:
+    """Build the user payload returned by /auth/login"""
     user_data = {
         "id": user.id,
         "username": user.username,
@@ -353,19 +618,72 @@ def login(login_data: LoginRequest, session: Session = Depends(get_session)):
         user_data["teacher_id"] = user.teacher.id
         user_data["employee_id"] = user.teacher.employee_id
     
-    return {
-        "access_token": access_token, 
-        "token_type": "bearer",
-        "user": user_data
-    }
+    return user_data
 
 @app.get("/auth/me", response_model=UserRead, tags=["Authentication"])
 def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
+@app.post("/auth/refresh", response_model=Token, tags=["Authentication"])
+def refresh_access_token(refresh_data: RefreshRequest, session: Session = Depends(get_session)):
+    """Exchange a refresh token for a new access token, rotating the refresh token"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    # Signature and expiry are checked with HMAC only - no bcrypt
+    try:
+        payload = jwt.decode(refresh_data.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("typ") != "refresh" or not payload.get("jti"):
+        raise credentials_exception
+    
+    stored = session.exec(select(RefreshToken).where(RefreshToken.jti == payload["jti"])).first()
+    if not stored or stored.expires_at <= datetime.utcnow():
+        raise credentials_exception
+    if stored.revoked_at is not None:
+        # A rotated-out token was replayed: assume it leaked and end every session of the user
+        revoke_refresh_tokens(stored.user_id, session)
+        session.commit()
+        raise credentials_exception
+    
+    user = load_principal(payload.get("sub"), session)
+    if not user or user.id != stored.user_id or not user.is_active:
+        raise credentials_exception
+    
+    # Rotate: the presented token is spent, its replacement keeps the original expiry
+    stored.revoked_at = datetime.utcnow()
+    session.add(stored)
+    refresh_token = issue_refresh_token(user, stored.expires_at, session)
+    
+    # Claims are rebuilt from the database so they pick up class changes and token revocations
+    user_data = get_login_user_data(user)
+    access_token = create_access_token(
+        data=build_token_claims(user, user_data),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    session.commit()
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @app.post("/auth/logout", tags=["Authentication"])
-def logout():
-    # Since JWT tokens are stateless, logout is handled on the frontend by removing the token
+def logout(logout_data: Optional[LogoutRequest] = None, session: Session = Depends(get_session)):
+    """Revoke the session's refresh token; the short-lived access token simply expires"""
+    if logout_data and logout_data.refresh_token:
+        try:
+            payload = jwt.decode(logout_data.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = {}
+        if payload.get("typ") == "refresh" and payload.get("jti"):
+            session.exec(
+                update(RefreshToken)
+                .where(RefreshToken.jti == payload["jti"], RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=datetime.utcnow())
+            )
+            session.commit()
     return {"message": "Successfully logged out"}
 
 # Admin endpoints for user management
@@ -402,21 +720,18 @@ def create_user(
     session.refresh(db_user)
     return db_user
 
-@app.get("/admin/users", response_model=List[UserRead], tags=["Admin - Users"])
+@app.get("/admin/users", response_model=Union[List[UserRead], CursorPage[UserRead]], tags=["Admin - Users"])
 def get_users(
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
-    return users
+    return paginate(session, select(User), page, [User.id])
 
 @app.get("/admin/users/{user_id}", response_model=UserRead, tags=["Admin - Users"])
 def get_user(
     user_id: int, 
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
     user = session.get(User, user_id)
@@ -450,9 +765,9 @@ def upload_user_photo(
         try:
             # Note: We can't actually delete from Cloudinary here since we don't have the API key
             # The frontend should handle Cloudinary deletion
-            print(f"Old photo should be deleted from Cloudinary: {user.photo_path}")
+            logger.info("Old photo should be deleted from Cloudinary", extra={"user_id": user.id, "photo_path": user.photo_path})
         except Exception as e:
-            print(f"Warning: Failed to delete old photo from Cloudinary: {e}")
+            logger.warning("Failed to delete old photo from Cloudinary: %s", e, extra={"user_id": user.id})
 
     # Update user with new photo data - store Cloudinary public ID and URL
     user.photo_path = photo_data['file_path']  # Cloudinary public ID
@@ -461,6 +776,7 @@ def upload_user_photo(
     session.add(user)
     session.commit()
     session.refresh(user)
+    principal_cache.invalidate(user.username)
 
     return user
 
@@ -491,6 +807,7 @@ def delete_user_photo(
     user.photo_url = None
     session.add(user)
     session.commit()
+    principal_cache.invalidate(user.username)
 
     return {"message": "Photo deleted successfully"}
 
@@ -554,31 +871,24 @@ def create_student(
     # Note: In a real implementation, you'd want to return the plain password only once for security
     return db_student
 
-@app.get("/admin/students", response_model=List[StudentRead], tags=["Admin - Students"])
+@app.get("/admin/students", response_model=Union[List[StudentRead], CursorPage[StudentRead]], tags=["Admin - Students"])
 def get_all_students(
-    skip: int = 0, 
-    limit: int = 100, 
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
-    statement = select(Student).offset(skip).limit(limit)
-    students = session.exec(statement).all()
-    
-    # Load user relationships
-    for student in students:
-        if student.user_id:
-            user = session.get(User, student.user_id)
-            student.user = user
-    
-    return students
+    # One query for the page with its users and classes joined in, whatever the page size
+    columns = [Student.id]
+    rows = session.exec(page_statement(STUDENT_PROJECTION.statement(), page, columns)).all()
+    return STUDENT_PROJECTION.response(page_response(rows, page, columns))
 
 @app.get("/admin/students/{student_id}", response_model=StudentRead, tags=["Admin - Students"])
 def get_student(
     student_id: int, 
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
-    student = session.get(Student, student_id)
+    student = session.get(Student, student_id, options=STUDENT_READ_OPTIONS)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
@@ -596,17 +906,28 @@ def update_student(
         raise HTTPException(status_code=404, detail="Student not found")
     
     # Update user information if provided
+    stale_principals = []
     if student_update.user:
         db_user = session.get(User, db_student.user_id)
         if db_user:
+            stale_principals.append(db_user.username)
             user_data = student_update.user.dict(exclude_unset=True)
             for field, value in user_data.items():
                 setattr(db_user, field, value)
+            stale_principals.append(db_user.username)
     
     # Update student information
     student_data = student_update.dict(exclude={'user'}, exclude_unset=True)
     datetime_fields = ['date_of_birth', 'admission_date']
     
+    # A class change makes the class_id claim in the student's tokens stale
+    if student_data.get('class_id') is not None and student_data['class_id'] != db_student.class_id:
+        db_user = session.get(User, db_student.user_id)
+        if db_user:
+            revoke_access_tokens(db_user)
+            session.add(db_user)
+            stale_principals.append(db_user.username)
+    
     for field, value in student_data.items():
         # Handle datetime field conversion from string to datetime
         if field in datetime_fields:
@@ -617,6 +938,7 @@ def update_student(
     
     session.add(db_student)
     session.commit()
+    principal_cache.invalidate(*stale_principals)
     session.refresh(db_student)
     return db_student
 
@@ -637,11 +959,14 @@ def delete_student(
     # Delete student first (due to foreign key constraints)
     session.delete(db_student)
     
-    # Then delete user if it exists
+    # Then delete user (and its refresh tokens) if it exists
     if db_user:
+        session.exec(delete(RefreshToken).where(RefreshToken.user_id == db_user.id))
         session.delete(db_user)
     
     session.commit()
+    if db_user:
+        principal_cache.invalidate(db_user.username)
     return {"message": "Student deleted successfully"}
 
 @app.patch("/admin/students/{student_id}/password", tags=["Admin - Students"])
@@ -661,10 +986,12 @@ def update_student_password(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Hash new password and update
+    # Hash new password and update; existing sessions must log in again
     db_user.password_hash = get_password_hash(password_data.password)
     session.add(db_user)
+    revoke_refresh_tokens(db_user.id, session)
     session.commit()
+    principal_cache.invalidate(db_user.username)
     
     return {"message": "Password updated successfully"}
 
@@ -694,23 +1021,15 @@ def create_teacher(
     session.refresh(db_teacher)
     return db_teacher
 
-@app.get("/admin/teachers", response_model=List[TeacherRead], tags=["Admin - Teachers"])
+@app.get("/admin/teachers", response_model=Union[List[TeacherRead], CursorPage[TeacherRead]], tags=["Admin - Teachers"])
 def get_all_teachers(
-    skip: int = 0, 
-    limit: int = 100, 
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
-    statement = select(Teacher).offset(skip).limit(limit)
-    teachers = session.exec(statement).all()
-    
-    # Load user relationships
-    for teacher in teachers:
-        if teacher.user_id:
-            user = session.get(User, teacher.user_id)
-            teacher.user = user
-    
-    return teachers
+    # One query for the page and one for its users, whatever the page size
+    statement = select(Teacher).options(*TEACHER_READ_OPTIONS)
+    return paginate(session, statement, page, [Teacher.id])
 
 @app.put("/admin/teachers/{teacher_id}", response_model=TeacherRead, tags=["Admin - Teachers"])
 def update_teacher(
@@ -725,12 +1044,15 @@ def update_teacher(
         raise HTTPException(status_code=404, detail="Teacher not found")
     
     # Update user information if provided
+    stale_principals = []
     if teacher_update.user:
         db_user = session.get(User, db_teacher.user_id)
         if db_user:
+            stale_principals.append(db_user.username)
             user_data = teacher_update.user.dict(exclude_unset=True)
             for field, value in user_data.items():
                 setattr(db_user, field, value)
+            stale_principals.append(db_user.username)
     
     # Update teacher information
     teacher_data = teacher_update.dict(exclude={'user'}, exclude_unset=True)
@@ -746,6 +1068,7 @@ def update_teacher(
     
     session.add(db_teacher)
     session.commit()
+    principal_cache.invalidate(*stale_principals)
     session.refresh(db_teacher)
     return db_teacher
 
@@ -766,11 +1089,14 @@ def delete_teacher(
     # Delete teacher first (due to foreign key constraint)
     session.delete(db_teacher)
     
-    # Then delete user if exists
+    # Then delete user (and its refresh tokens) if exists
     if db_user:
+        session.exec(delete(RefreshToken).where(RefreshToken.user_id == db_user.id))
         session.delete(db_user)
     
     session.commit()
+    if db_user:
+        principal_cache.invalidate(db_user.username)
     return {"message": "Teacher deleted successfully"}
 
 @app.patch("/admin/teachers/{teacher_id}/password", tags=["Admin - Teachers"])
@@ -790,10 +1116,12 @@ def update_teacher_password(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Update password
+    # Update password; existing sessions must log in again
     db_user.password_hash = get_password_hash(password_update.password)
     session.add(db_user)
+    revoke_refresh_tokens(db_user.id, session)
     session.commit()
+    principal_cache.invalidate(db_user.username)
     
     return {"message": "Password updated successfully"}
 
@@ -812,7 +1140,7 @@ def create_class(
 
 @app.get("/admin/classes", response_model=List[ClassRead], tags=["Admin - Classes"])
 def get_all_classes(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
     statement = select(Class)
@@ -920,14 +1248,13 @@ def create_subject(
     session.refresh(db_subject)
     return db_subject
 
-@app.get("/admin/subjects", tags=["Admin - Subjects"], response_model=List[SubjectRead])
+@app.get("/admin/subjects", tags=["Admin - Subjects"], response_model=Union[List[SubjectRead], CursorPage[SubjectRead]])
 def get_all_subjects(
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    statement = select(Subject)
-    subjects = session.exec(statement).all()
-    return subjects
+    return paginate(session, select(Subject), page, [Subject.id])
 
 @app.put("/admin/subjects/{subject_id}", tags=["Admin - Subjects"], response_model=SubjectRead)
 def update_subject(
@@ -1007,26 +1334,19 @@ def mark_attendance(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    # Check if attendance already exists for this student, class and date combination
-    statement = select(Attendance).where(
-        Attendance.student_id == attendance.student_id,
-        Attendance.class_id == attendance.class_id,
-        func.date(Attendance.date) == attendance.date.date()
-    )
-    existing = session.exec(statement).first()
-    
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Attendance already marked for this student in this class on {attendance.date.date()}"
-        )
-    
+    # The unique (student, class, day) index rejects duplicates, including concurrent ones
     try:
         db_attendance = Attendance(**attendance.dict())
         session.add(db_attendance)
         session.commit()
         session.refresh(db_attendance)
         return db_attendance
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Attendance already marked for this student in this class on {attendance.date.date()}"
+        )
     except Exception as e:
         session.rollback()
         raise HTTPException(
@@ -1034,197 +1354,257 @@ def mark_attendance(
             detail=f"Failed to mark attendance: {str(e)}"
         )
 
+def existing_attendance_keys(session: Session, keys) -> set:
+    """Return which (student_id, class_id, attendance_day) keys already have a mark.
+    One query per max_bind_parameters() // 3 keys (a key binds at most one value per column).
+    """
+    found = set()
+    batch_size = max_bind_parameters() // 3
+    for first in range(0, len(keys), batch_size):
+        batch = keys[first:first + batch_size]
+        statement = select(Attendance.student_id, Attendance.class_id, Attendance.attendance_day).where(
+            Attendance.student_id.in_({key[0] for key in batch}),
+            Attendance.class_id.in_({key[1] for key in batch}),
+            Attendance.attendance_day.in_({key[2] for key in batch}),
+        )
+        found.update(session.exec(statement).all())
+    return found & set(keys)
+
+ATTENDANCE_RETURNING = (
+    Attendance.id, Attendance.student_id, Attendance.class_id,
+    Attendance.attendance_day, Attendance.date, Attendance.status, Attendance.remarks,
+)
+
+ATTENDANCE_UPSERT_KEY = ["student_id", "class_id", "attendance_day"]
+
+def attendance_upsert(values: List[dict]):
+    """INSERT ... ON CONFLICT DO UPDATE that overwrites the mark already recorded for a student, class and day."""
+    statement = upsert_insert(Attendance).values(values)
+    return statement.on_conflict_do_update(
+        index_elements=ATTENDANCE_UPSERT_KEY,
+        set_={
+            "date": statement.excluded.date,
+            "status": statement.excluded.status,
+            "remarks": statement.excluded.remarks,
+        },
+    )
+
 @app.post("/admin/attendance/bulk", tags=["Admin - Attendance"], response_model=List[AttendanceRead])
 def mark_bulk_attendance(
     attendance_list: List[AttendanceCreate], 
     session: Session = Depends(get_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    """Mark attendance for multiple students at once"""
+    """Mark attendance for multiple students at once.
+    One query finds already-marked students, one multi-row INSERT ... RETURNING writes the rest.
+    """
     if not attendance_list:
         raise HTTPException(status_code=400, detail="No attendance data provided")
     
-    created_records = []
+    rows = {}
     errors = []
-    
-    for i, attendance in enumerate(attendance_list):
-        try:
-            # Check if attendance already exists for this student, class and date combination
-            statement = select(Attendance).where(
-                Attendance.student_id == attendance.student_id,
-                Attendance.class_id == attendance.class_id,
-                func.date(Attendance.date) == attendance.date.date()
-            )
-            existing = session.exec(statement).first()
-            
-            if existing:
-                errors.append(f"Student {attendance.student_id}: Attendance already marked for this class on {attendance.date.date()}")
-                continue
-            
-            db_attendance = Attendance(**attendance.dict())
-            session.add(db_attendance)
-            session.flush()  # Flush but don't commit yet
-            created_records.append(db_attendance)
-            
-        except Exception as e:
-            errors.append(f"Student {attendance.student_id}: {str(e)}")
-    
-    if errors and not created_records:
-        # All records failed
-        session.rollback()
+    for attendance in attendance_list:
+        values = attendance.dict()
+        values["attendance_day"] = attendance.date.date()
+        key = (values["student_id"], values["class_id"], values["attendance_day"])
+        if key in rows:
+            errors.append(f"Student {attendance.student_id}: Attendance listed more than once for {attendance.date.date()}")
+            continue
+        rows[key] = values
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        for values in rows.values():
+            logger.debug("Marking attendance", extra={"record": values})
+    
+    for key in existing_attendance_keys(session, list(rows)):
+        rows.pop(key)
+        errors.append(f"Student {key[0]}: Attendance already marked for this class on {key[2]}")
+    
+    if not rows:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to mark attendance for all students: {'; '.join(errors)}"
         )
     
     try:
+        # executemany + RETURNING is sent as multi-row INSERTs, each below max_bind_parameters()
+        values = list(rows.values())
+        statement = insert(Attendance).returning(*ATTENDANCE_RETURNING).execution_options(
+            insertmanyvalues_page_size=max(1, max_bind_parameters() // len(values[0]))
+        )
+        created_records = [dict(row._mapping) for row in session.execute(statement, values)]
         session.commit()
-        # Refresh all created records
-        for record in created_records:
-            session.refresh(record)
-        
-        if errors:
-            # Some records failed, log the errors but return successful ones
-            print(f"Partial success - errors: {errors}")
-        
-        return created_records
-        
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Attendance for some of these students was marked concurrently. Please reload and retry."
+        )
     except Exception as e:
         session.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to commit attendance records: {str(e)}"
         )
+    
+    if errors:
+        # Some records failed, log the errors but return successful ones
+        logger.warning("Bulk attendance partially applied", extra={"created_count": len(created_records), "errors": errors})
+    
+    return created_records
 
-@app.put("/admin/attendance/{attendance_id}", tags=["Admin - Attendance"], response_model=AttendanceRead)
-def update_attendance(
-    attendance_id: int, 
-    attendance_update: AttendanceCreate, 
+@app.post("/admin/attendance/upsert", tags=["Admin - Attendance"], response_model=AttendanceUpsertResult)
+def upsert_attendance(
+    attendance_list: List[AttendanceCreate], 
     session: Session = Depends(get_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    # Get existing attendance record
-    db_attendance = session.get(Attendance, attendance_id)
-    if not db_attendance:
-        raise HTTPException(status_code=404, detail="Attendance record not found")
+    """Write a whole roster with INSERT ... ON CONFLICT DO UPDATE, in one transaction.
+    Marks that already exist for the student, class and day are overwritten. Large rosters
+    are split into statements of at most max_bind_parameters() bind parameters.
+    """
+    if not attendance_list:
+        raise HTTPException(status_code=400, detail="No attendance data provided")
     
-    # Update the attendance record
-    attendance_data = attendance_update.dict(exclude_unset=True)
-    for field, value in attendance_data.items():
-        setattr(db_attendance, field, value)
+    # One row per key (last one wins): ON CONFLICT cannot touch the same row twice
+    rows = {}
+    for attendance in attendance_list:
+        values = attendance.dict()
+        values["attendance_day"] = attendance.date.date()
+        rows[(values["student_id"], values["class_id"], values["attendance_day"])] = values
     
-    session.add(db_attendance)
-    session.commit()
-    session.refresh(db_attendance)
-    return db_attendance
+    keys = list(rows)
+    batch_size = max(1, max_bind_parameters() // len(rows[keys[0]]))
+    inserted, updated = [], []
+    try:
+        for first in range(0, len(keys), batch_size):
+            batch = keys[first:first + batch_size]
+            if IS_POSTGRES:
+                # xmax is 0 only on tuples created by this statement
+                statement = attendance_upsert([rows[key] for key in batch])
+                statement = statement.returning(*ATTENDANCE_RETURNING, literal_column("xmax = 0").label("inserted"))
+                for row in session.execute(statement):
+                    values = dict(row._mapping)
+                    (inserted if values.pop("inserted") else updated).append(values)
+                continue
+            
+            # SQLite has no xmax: DO NOTHING returns exactly the rows it inserted, and that statement
+            # holds the write lock until commit, so the rest of the batch are the rows that already existed
+            statement = upsert_insert(Attendance).values([rows[key] for key in batch])
+            statement = statement.on_conflict_do_nothing(index_elements=ATTENDANCE_UPSERT_KEY)
+            fresh = [dict(row._mapping) for row in session.execute(statement.returning(*ATTENDANCE_RETURNING))]
+            inserted.extend(fresh)
+            fresh_keys = {(row["student_id"], row["class_id"], row["attendance_day"]) for row in fresh}
+            existing = [rows[key] for key in batch if key not in fresh_keys]
+            if existing:
+                statement = attendance_upsert(existing).returning(*ATTENDANCE_RETURNING)
+                updated.extend(dict(row._mapping) for row in session.execute(statement))
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Failed to upsert attendance: every student and class in the roster must exist"
+        )
+    
+    return AttendanceUpsertResult(inserted=inserted, updated=updated)
 
+# Registered before /{attendance_id} so that "bulk" is not parsed as an id
 @app.put("/admin/attendance/bulk", tags=["Admin - Attendance"], response_model=List[AttendanceRead])
 def update_bulk_attendance(
-    attendance_updates: List[dict], 
+    attendance_updates: List[AttendanceBulkUpdate], 
     session: Session = Depends(get_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    """Update attendance for multiple students at once"""
+    """Update attendance for multiple records at once.
+    One query loads the supplied ids, one batched UPDATE (executemany by primary key) writes them.
+    """
     if not attendance_updates:
         raise HTTPException(status_code=400, detail="No attendance data provided")
     
-    print(f"Received bulk update request with {len(attendance_updates)} records")
-    print(f"Sample record: {attendance_updates[0] if attendance_updates else 'None'}")
+    # Later entries for the same id win; an explicit null (remarks only) is written, an omitted field is kept
+    changes = {item.id: item.model_dump(exclude_unset=True, exclude={"id"}) for item in attendance_updates}
     
-    updated_records = []
-    errors = []
+    current = {
+        row.id: dict(row._mapping)
+        for row in session.execute(select(*ATTENDANCE_RETURNING).where(Attendance.id.in_(changes)))
+    }
+    errors = [f"Attendance record with ID {attendance_id} not found" for attendance_id in changes if attendance_id not in current]
+    if not current:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to update attendance for all records. Errors: {'; '.join(errors)}"
+        )
     
-    for i, update_data in enumerate(attendance_updates):
-        try:
-            print(f"Processing record {i+1}: {update_data}")
-            
-            # Try different field names for attendance ID
-            attendance_id = (update_data.get('attendanceId') or 
-                           update_data.get('id') or 
-                           update_data.get('attendance_id'))
-            
-            if not attendance_id:
-                error_msg = f"Record {i+1}: Missing attendance ID. Available fields: {list(update_data.keys())}"
-                print(error_msg)
-                errors.append(error_msg)
-                continue
-                
-            # Get existing attendance record
-            db_attendance = session.get(Attendance, attendance_id)
-            if not db_attendance:
-                error_msg = f"Record {i+1}: Attendance record with ID {attendance_id} not found"
-                print(error_msg)
-                errors.append(error_msg)
-                continue
-            
-            # Update the attendance record with proper field mapping
-            updated_fields = []
-            
-            # Update status field - this is the most important field
-            if 'status' in update_data and update_data['status'] is not None:
-                old_status = db_attendance.status
-                db_attendance.status = update_data['status']
-                # Also update is_present for consistency
-                db_attendance.is_present = update_data['status'] == 'present'
-                updated_fields.append(f"status: {old_status} -> {update_data['status']}")
-                updated_fields.append(f"is_present: {not (update_data['status'] == 'present')} -> {update_data['status'] == 'present'}")
-            
-            # Update other fields if provided
-            for field, value in update_data.items():
-                if field in ['attendanceId', 'id', 'attendance_id', 'status']:
-                    continue  # Skip ID fields and status (already handled)
-                if hasattr(db_attendance, field) and value is not None:
-                    old_value = getattr(db_attendance, field)
-                    setattr(db_attendance, field, value)
-                    updated_fields.append(f"{field}: {old_value} -> {value}")
-            
-            print(f"Updated fields for record {attendance_id}: {updated_fields}")
-            
-            session.add(db_attendance)
-            session.flush()  # Flush but don't commit yet
-            updated_records.append(db_attendance)
-            
-        except Exception as e:
-            error_msg = f"Record {i+1}: {str(e)}"
-            print(f"Error processing record {i+1}: {e}")
-            errors.append(error_msg)
+    if logger.isEnabledFor(logging.DEBUG):
+        for attendance_id, change in changes.items():
+            logger.debug("Updating attendance", extra={"attendance_id": attendance_id, "changes": change})
     
-    if errors and not updated_records:
-        # All records failed
-        session.rollback()
-        error_detail = f"Failed to update attendance for all records. Errors: {'; '.join(errors)}"
-        print(error_detail)
-        raise HTTPException(status_code=400, detail=error_detail)
+    # Every row carries every column so the whole batch is a single executemany
+    updated_records = []
+    for attendance_id, row in current.items():
+        row.update(changes[attendance_id])
+        if isinstance(row["status"], AttendanceStatus):
+            row["status"] = row["status"].value
+        row["attendance_day"] = row["date"].date()
+        updated_records.append(row)
     
     try:
+        session.execute(update(Attendance), updated_records)
         session.commit()
-        print(f"Successfully committed {len(updated_records)} attendance updates")
-        
-        # Refresh all updated records
-        for record in updated_records:
-            session.refresh(record)
-        
-        if errors:
-            # Some records failed, log the errors but return successful ones
-            print(f"Partial success - {len(updated_records)} succeeded, {len(errors)} failed")
-            print(f"Errors: {errors}")
-        
-        return updated_records
-        
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Update would record two marks for the same student, class and day"
+        )
     except Exception as e:
         session.rollback()
-        error_detail = f"Failed to commit attendance updates: {str(e)}"
-        print(error_detail)
-        raise HTTPException(status_code=500, detail=error_detail)
+        raise HTTPException(status_code=500, detail=f"Failed to commit attendance updates: {str(e)}")
+    
+    if errors:
+        logger.warning("Bulk attendance update partially applied", extra={"updated_count": len(updated_records), "errors": errors})
+    
+    return updated_records
 
-@app.get("/admin/attendance", tags=["Admin - Attendance"], response_model=List[AttendanceRead])
+@app.put("/admin/attendance/{attendance_id}", tags=["Admin - Attendance"], response_model=AttendanceRead)
+def update_attendance(
+    attendance_id: int, 
+    attendance_update: AttendanceCreate, 
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_teacher_or_admin)
+):
+    # Get existing attendance record
+    db_attendance = session.get(Attendance, attendance_id)
+    if not db_attendance:
+        raise HTTPException(status_code=404, detail="Attendance record not found")
+    
+    # Update the attendance record
+    attendance_data = attendance_update.dict(exclude_unset=True)
+    for field, value in attendance_data.items():
+        setattr(db_attendance, field, value)
+    
+    # Moving the mark onto another student or day can collide with the unique (student, class, day) index
+    try:
+        session.add(db_attendance)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Attendance already marked for this student in this class on {attendance_update.date.date()}"
+        )
+    session.refresh(db_attendance)
+    return db_attendance
+
+@app.get("/admin/attendance", tags=["Admin - Attendance"], response_model=Union[List[AttendanceRead], CursorPage[AttendanceRead]])
 def get_attendance(
     class_id: int = None,
     student_id: int = None,
     date: str = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session)
 ):
     statement = select(Attendance)
     if class_id:
@@ -1234,11 +1614,11 @@ def get_attendance(
     if date:
         from datetime import datetime
         parsed_date = datetime.fromisoformat(date.replace('Z', '+00:00'))
-        statement = statement.where(func.date(Attendance.date) == parsed_date.date())
+        statement = statement.where(Attendance.attendance_day == parsed_date.date())
+    statement = dates.apply(statement, Attendance.attendance_day)
     
-    statement = statement.offset(skip).limit(limit)
-    attendance = session.exec(statement).all()
-    return attendance
+    # Newest first in both modes, walking ix_attendances_date_id backwards
+    return paginate(session, statement, page, [Attendance.date, Attendance.id], descending=True)
 
 # Exam management
 @app.post("/admin/exams", tags=["Admin - Exams"], response_model=ExamRead)
@@ -1253,14 +1633,15 @@ def create_exam(
     session.refresh(db_exam)
     return db_exam
 
-@app.get("/admin/exams", tags=["Admin - Exams"], response_model=List[ExamRead])
+@app.get("/admin/exams", tags=["Admin - Exams"], response_model=Union[List[ExamRead], CursorPage[ExamRead]])
 def get_all_exams(
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    statement = select(Exam)
-    exams = session.exec(statement).all()
-    return exams
+    statement = dates.apply(select(Exam).options(*EXAM_READ_OPTIONS), Exam.exam_date)
+    return paginate(session, statement, page, [Exam.exam_date, Exam.id], descending=True)
 
 @app.put("/admin/exams/{exam_id}", tags=["Admin - Exams"], response_model=ExamRead)
 def update_exam(
@@ -1390,25 +1771,27 @@ def create_exam_result(result: ExamResultCreate, session: Session = Depends(get_
             detail=f"Failed to create exam result: {str(e)}"
         )
 
-@app.get("/admin/exam-results", tags=["Admin - Exam Results"], response_model=List[ExamResultRead])
+@app.get("/admin/exam-results", tags=["Admin - Exam Results"], response_model=Union[List[ExamResultRead], CursorPage[ExamResultRead]])
 def get_exam_results(
     exam_id: int = None,
     student_id: int = None,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
-    statement = select(ExamResult).options(
-        selectinload(ExamResult.student).selectinload(Student.user),
-        selectinload(ExamResult.exam).selectinload(Exam.subject),
-        selectinload(ExamResult.exam).selectinload(Exam.class_assigned)
-    )
+    statement = EXAM_RESULT_PROJECTION.statement()
     if exam_id:
         statement = statement.where(ExamResult.exam_id == exam_id)
     if student_id:
         statement = statement.where(ExamResult.student_id == student_id)
+    if dates.active:
+        # Results have no date of their own; filter on their exam's date
+        statement = statement.where(ExamResult.exam_id.in_(dates.apply(select(Exam.id), Exam.exam_date)))
     
-    results = session.exec(statement).all()
-    return results
+    columns = [ExamResult.id]
+    rows = session.exec(page_statement(statement, page, columns)).all()
+    return EXAM_RESULT_PROJECTION.response(page_response(rows, page, columns))
 
 @app.put("/admin/exam-results/{result_id}", tags=["Admin - Exam Results"], response_model=ExamResultRead)
 def update_exam_result(result_id: int, result_update: ExamResultUpdate, session: Session = Depends(get_session), current_user: User = Depends(require_teacher_or_admin)):
@@ -1470,17 +1853,19 @@ def create_study_material(
     session.refresh(db_material)
     return db_material
 
-@app.get("/admin/study-materials", tags=["Admin - Study Materials"], response_model=List[StudyMaterialRead])
+@app.get("/admin/study-materials", tags=["Admin - Study Materials"], response_model=Union[List[StudyMaterialRead], CursorPage[StudyMaterialRead]])
 def get_study_materials(
     subject_id: int = None,
-    session: Session = Depends(get_session)
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session)
 ):
-    statement = select(StudyMaterial)
+    statement = select(StudyMaterial).options(*STUDY_MATERIAL_READ_OPTIONS)
     if subject_id:
         statement = statement.where(StudyMaterial.subject_id == subject_id)
+    statement = dates.apply(statement, StudyMaterial.created_at)
     
-    materials = session.exec(statement).all()
-    return materials
+    return paginate(session, statement, page, [StudyMaterial.created_at, StudyMaterial.id], descending=True)
 
 # Notices
 @app.post("/admin/notices", tags=["Admin - Notices"], response_model=NoticeRead)
@@ -1490,7 +1875,7 @@ def create_notice(
     current_user: User = Depends(require_admin)
 ):
     db_notice = Notice(
-        **notice.dict(),
+        **notice.dict(exclude={"created_by_id"}),
         created_by_id=current_user.id
     )
     session.add(db_notice)
@@ -1498,11 +1883,13 @@ def create_notice(
     session.refresh(db_notice)
     return db_notice
 
-@app.get("/admin/notices", tags=["Admin - Notices"], response_model=List[NoticeRead])
+@app.get("/admin/notices", tags=["Admin - Notices"], response_model=Union[List[NoticeRead], CursorPage[NoticeRead]])
 def get_notices(
     target_role: UserRole = None,
     active_only: bool = True,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_teacher_or_admin)
 ):
     statement = select(Notice)
@@ -1517,38 +1904,108 @@ def get_notices(
     
     if active_only:
         statement = statement.where(Notice.is_active == True)
-    
-    statement = statement.order_by(Notice.created_at.desc())
-    notices = session.exec(statement).all()
-    return notices
+    statement = dates.apply(statement, Notice.created_at)
+    
+    return paginate(session, statement, page, [Notice.created_at, Notice.id], descending=True)
+
+# Public response cache: the landing-page endpoints are served from pre-serialized JSON
+# bytes with an ETag, so repeat visitors (and the service worker) mostly get a 304.
+# Browsers may reuse a response for PUBLIC_MAX_AGE_SECONDS before revalidating.
+PUBLIC_MAX_AGE_SECONDS = int(os.getenv("PUBLIC_MAX_AGE_SECONDS", 60))
+
+# public_cache key -> tables it is built from
+PUBLIC_CACHE_TABLES = {
+    "notices": {Notice.__tablename__},
+    "classes": {Class.__tablename__},
+}
+
+# Bumped on every invalidation, so a response built from a read that raced with a
+# write is not stored over the invalidation. Entries are rebuilt from the primary
+# (get_async_primary_session), never from a replica that may not have the write yet.
+public_cache_generation = 0
+
+@on_table_change
+def invalidate_public_cache(tables):
+    global public_cache_generation
+    for key, sources in PUBLIC_CACHE_TABLES.items():
+        if None in tables or tables & sources:
+            public_cache_generation += 1
+            public_cache.invalidate(key)
+
+def build_public_entry(items, adapter: TypeAdapter) -> dict:
+    body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    # "encoded" collects the compressed copies of body, made on first request per encoding
+    return {"body": body, "etag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', "encoded": {}}
+
+def store_public_entry(key: str, entry: dict, generation: int, ttl: Optional[float] = None) -> None:
+    lifetime = public_cache.ttl if ttl is None else min(ttl, public_cache.ttl)
+    entry["stale_at"] = time.monotonic() + lifetime
+    if lifetime > 0 and generation == public_cache_generation:
+        public_cache.set(key, entry, ttl=lifetime)
+
+def public_response(request: Request, entry: dict) -> Response:
+    """The cached body (pre-compressed when the client accepts it), or 304 Not Modified when
+    the client already has any encoding of it"""
+    encoding, body = cached_variant(entry["encoded"], entry["body"], request.headers.get("accept-encoding"))
+    max_age = max(0, min(PUBLIC_MAX_AGE_SECONDS, int(entry["stale_at"] - time.monotonic())))
+    headers = {
+        "ETag": variant_etag(entry["etag"], encoding),
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if any(etag_matches(if_none_match, variant_etag(entry["etag"], known)) for known in (None,) + SUPPORTED_ENCODINGS):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+NOTICE_LIST = TypeAdapter(List[NoticeRead])
+CLASS_LIST = TypeAdapter(List[ClassRead])
 
 # Public notices endpoint (no authentication required)
 @app.get("/public/notices", tags=["Public"], response_model=List[NoticeRead])
-def get_public_notices(
-    session: Session = Depends(get_session)
+async def get_public_notices(
+    request: Request,
+    session: AsyncSession = Depends(get_async_primary_session)
 ):
     """Get public notices for display on landing page and public areas"""
-    statement = select(Notice).where(
-        Notice.is_active == True,
-        Notice.show_on_landing == True,
-        # Check if notice hasn't expired
-        or_(
-            Notice.expires_at.is_(None),
-            Notice.expires_at > datetime.utcnow()
-        )
-    ).order_by(Notice.created_at.desc())
-    notices = session.exec(statement).all()
-    return notices
+    entry = public_cache.get("notices")
+    if entry is None:
+        generation = public_cache_generation
+        now = datetime.utcnow()
+        statement = select(Notice).where(
+            Notice.is_active == True,
+            Notice.show_on_landing == True,
+            # Check if notice hasn't expired
+            or_(
+                Notice.expires_at.is_(None),
+                Notice.expires_at > now
+            )
+        ).order_by(Notice.created_at.desc())
+        notices = (await session.exec(statement)).all()
+        
+        # Keep the entry only until the first of these notices expires
+        expiries = [notice.expires_at for notice in notices if notice.expires_at]
+        ttl = (min(expiries) - now).total_seconds() if expiries else None
+        entry = build_public_entry(notices, NOTICE_LIST)
+        store_public_entry("notices", entry, generation, ttl)
+    return public_response(request, entry)
 
 # Public classes endpoint (no authentication required)
 @app.get("/public/classes", tags=["Public"], response_model=List[ClassRead])
-def get_public_classes(
-    session: Session = Depends(get_session)
+async def get_public_classes(
+    request: Request,
+    session: AsyncSession = Depends(get_async_primary_session)
 ):
     """Get all available classes for public admission forms"""
-    statement = select(Class)
-    classes = session.exec(statement).all()
-    return classes
+    entry = public_cache.get("classes")
+    if entry is None:
+        generation = public_cache_generation
+        classes = (await session.exec(select(Class))).all()
+        entry = build_public_entry(classes, CLASS_LIST)
+        store_public_entry("classes", entry, generation)
+    return public_response(request, entry)
 
 # Public admission endpoint (no authentication required)
 @app.post("/public/admission", tags=["Public"], response_model=AdmissionRequestRead)
@@ -1657,19 +2114,16 @@ def create_class_schedule(
     session.refresh(db_schedule)
     return db_schedule
 
-@app.get("/admin/class-schedules", tags=["Admin - Schedules"], response_model=List[ClassScheduleRead])
+@app.get("/admin/class-schedules", tags=["Admin - Schedules"], response_model=Union[List[ClassScheduleRead], CursorPage[ClassScheduleRead]])
 def get_class_schedules(
     day_of_week: DayOfWeek = None,
     class_id: int = None,
     teacher_id: int = None,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
-    statement = select(ClassSchedule).options(
-        selectinload(ClassSchedule.subject),
-        selectinload(ClassSchedule.class_assigned),
-        selectinload(ClassSchedule.teacher)
-    )
+    statement = select(ClassSchedule).options(*CLASS_SCHEDULE_READ_OPTIONS)
     
     if day_of_week:
         statement = statement.where(ClassSchedule.day_of_week == day_of_week)
@@ -1678,64 +2132,54 @@ def get_class_schedules(
     if teacher_id:
         statement = statement.where(ClassSchedule.teacher_id == teacher_id)
     
-    statement = statement.order_by(ClassSchedule.day_of_week, ClassSchedule.start_time)
-    schedules = session.exec(statement).all()
-    return schedules
+    return paginate(session, statement, page, [ClassSchedule.day_of_week, ClassSchedule.start_time, ClassSchedule.id])
 
 @app.get("/teacher/{teacher_id}/schedule", tags=["Teachers"], response_model=List[ClassScheduleRead])
-def get_teacher_schedule(
+async def get_teacher_schedule(
     teacher_id: int,
     day_of_week: DayOfWeek = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher_or_admin)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(require_teacher_or_admin_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(ClassSchedule, Subject, Class, Teacher, User))
 ):
     # Validate teacher access (teachers can only see their own schedule, admins can see any)
     if current_user.role == "teacher":
-        teacher_statement = select(Teacher).where(Teacher.user_id == current_user.id)
-        teacher = session.exec(teacher_statement).first()
-        if not teacher or teacher.id != teacher_id:
+        if not await is_own_teacher_record_async(teacher_id, current_user, session, claims):
             raise HTTPException(status_code=403, detail="Access denied. You can only view your own schedule.")
     
-    statement = select(ClassSchedule).options(
-        selectinload(ClassSchedule.subject),
-        selectinload(ClassSchedule.class_assigned)
-    ).where(ClassSchedule.teacher_id == teacher_id)
+    statement = select(ClassSchedule).options(*CLASS_SCHEDULE_READ_OPTIONS).where(ClassSchedule.teacher_id == teacher_id)
     
     if day_of_week:
         statement = statement.where(ClassSchedule.day_of_week == day_of_week)
     
     statement = statement.order_by(ClassSchedule.start_time)
-    schedules = session.exec(statement).all()
+    schedules = (await session.exec(statement)).all()
     return schedules
 
 @app.get("/student/{student_id}/schedule", tags=["Students"], response_model=List[ClassScheduleRead])
-def get_student_schedule(
+async def get_student_schedule(
     student_id: int,
     day_of_week: DayOfWeek = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(ClassSchedule, Subject, Class, Teacher, User, Student))
 ):
     # Validate access
-    validate_student_access(student_id, current_user, session)
+    await validate_student_access_async(student_id, current_user, session, claims)
     
     # First get the student's class
-    student_statement = select(Student).where(Student.id == student_id)
-    student = session.exec(student_statement).first()
-    
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+    class_id = await get_student_class_id_async(student_id, session, claims)
     
     # Get schedules for the student's class
-    statement = select(ClassSchedule).options(
-        selectinload(ClassSchedule.subject),
-        selectinload(ClassSchedule.teacher)
-    ).where(ClassSchedule.class_id == student.class_id)
+    statement = select(ClassSchedule).options(*CLASS_SCHEDULE_READ_OPTIONS).where(ClassSchedule.class_id == class_id)
     
     if day_of_week:
         statement = statement.where(ClassSchedule.day_of_week == day_of_week)
     
     statement = statement.order_by(ClassSchedule.start_time)
-    schedules = session.exec(statement).all()
+    schedules = (await session.exec(statement)).all()
     return schedules
 
 @app.delete("/admin/class-schedules/{schedule_id}", tags=["Admin - Schedules"])
@@ -1779,65 +2223,134 @@ def create_teacher_review(
     session.refresh(db_review)
     return db_review
 
-@app.get("/admin/teacher-reviews", tags=["Admin - Reviews"], response_model=List[TeacherReviewRead])
+@app.get("/admin/teacher-reviews", tags=["Admin - Reviews"], response_model=Union[List[TeacherReviewRead], CursorPage[TeacherReviewRead]])
 def get_teacher_reviews(
     teacher_id: int = None,
-    session: Session = Depends(get_session)
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session)
 ):
     statement = select(TeacherReview)
     if teacher_id:
         statement = statement.where(TeacherReview.teacher_id == teacher_id)
+    statement = dates.apply(statement, TeacherReview.review_date)
     
-    statement = statement.order_by(TeacherReview.review_date.desc())
-    reviews = session.exec(statement).all()
-    return reviews
+    return paginate(session, statement, page, [TeacherReview.review_date, TeacherReview.id], descending=True)
 
 # Dashboard/Statistics
+DASHBOARD_COUNTS = {
+    "total_students": Student,
+    "total_teachers": Teacher,
+    "total_classes": Class,
+    "total_subjects": Subject,
+}
+
+DATA_STATS_COUNTS = {
+    "users": User,
+    "teachers": Teacher,
+    "students": Student,
+    "classes": Class,
+    "subjects": Subject,
+    "attendance_records": Attendance,
+    "exams": Exam,
+    "exam_results": ExamResult,
+    "study_materials": StudyMaterial,
+    "notices": Notice,
+    "teacher_reviews": TeacherReview,
+}
+
+# Background data-stats counts for ?mode=snapshot: recounted every DATA_STATS_REFRESH_SECONDS
+# (0 disables the thread) and shortly after writes. Counted on the primary, where the
+# writes that trigger a recount are already visible.
+data_stats_refresher = CountRefresher(
+    "data-stats",
+    lambda: Session(engine),
+    DATA_STATS_COUNTS,
+    interval=float(os.getenv("DATA_STATS_REFRESH_SECONDS", 300)),
+)
+
+# stats_cache key -> tables it is computed from
+STATS_CACHE_TABLES = {
+    "dashboard": {model.__tablename__ for model in DASHBOARD_COUNTS.values()} | {Notice.__tablename__},
+}
+DATA_STATS_TABLES = {model.__tablename__ for model in DATA_STATS_COUNTS.values()}
+
+@on_table_change
+def invalidate_stats_cache(tables):
+    for key, sources in STATS_CACHE_TABLES.items():
+        if None in tables or tables & sources:
+            stats_cache.invalidate(key)
+    if None in tables or tables & DATA_STATS_TABLES:
+        data_stats_refresher.mark_stale()
+
 @app.get("/admin/dashboard", tags=["Admin - Dashboard"], response_model=DashboardStats)
-def get_dashboard_stats(session: Session = Depends(get_session)):
-    # Count totals using SQLModel
-    total_students = len(session.exec(select(Student)).all())
-    total_teachers = len(session.exec(select(Teacher)).all())
-    total_classes = len(session.exec(select(Class)).all())
-    total_subjects = len(session.exec(select(Subject)).all())
-    
-    # Get recent notices
-    statement = select(Notice).where(Notice.is_active == True).order_by(Notice.created_at.desc()).limit(5)
-    recent_notices = session.exec(statement).all()
-    
-    return DashboardStats(
-        total_students=total_students,
-        total_teachers=total_teachers,
-        total_classes=total_classes,
-        total_subjects=total_subjects,
-        recent_notices=recent_notices
-    )
+def get_dashboard_stats(session: Session = Depends(get_primary_read_session)):
+    dashboard = stats_cache.get("dashboard")
+    if dashboard is None:
+        counts = count_rows(session, DASHBOARD_COUNTS)
+        
+        # Get recent notices
+        statement = select(Notice).where(Notice.is_active == True).order_by(Notice.created_at.desc()).limit(5)
+        recent_notices = session.exec(statement).all()
+        
+        dashboard = DashboardStats(**counts, recent_notices=recent_notices)
+        stats_cache.set("dashboard", dashboard)
+    return dashboard
 
 # Data management endpoints
 
 @app.get("/admin/data-stats", tags=["Admin - Data Management"])
-def get_data_statistics(session: Session = Depends(get_session)):
-    """Get current database statistics"""
+def get_data_statistics(
+    mode: str = Query("exact", pattern="^(exact|snapshot|estimated)$"),
+    session: Session = Depends(get_primary_read_session)
+):
+    """Get current database statistics.
+    exact: counted now on the primary, in one statement.
+    snapshot: the latest background count (see DATA_STATS_REFRESH_SECONDS); as_of says when
+    it was taken, and it may miss writes made since.
+    estimated: planner row estimates (pg_class.reltuples / sqlite_stat1), falling back to
+    the background count for tables that have no statistics yet.
+    """
     try:
-        stats = {
-            "users": len(session.exec(select(User)).all()),
-            "teachers": len(session.exec(select(Teacher)).all()),
-            "students": len(session.exec(select(Student)).all()),
-            "classes": len(session.exec(select(Class)).all()),
-            "subjects": len(session.exec(select(Subject)).all()),
-            "attendance_records": len(session.exec(select(Attendance)).all()),
-            "exams": len(session.exec(select(Exam)).all()),
-            "exam_results": len(session.exec(select(ExamResult)).all()),
-            "study_materials": len(session.exec(select(StudyMaterial)).all()),
-            "notices": len(session.exec(select(Notice)).all()),
-            "teacher_reviews": len(session.exec(select(TeacherReview)).all())
-        }
+        if mode == "exact":
+            return {"database_statistics": count_rows(session, DATA_STATS_COUNTS), "mode": mode, "as_of": datetime.utcnow()}
+        
+        snapshot = data_stats_refresher.snapshot()
+        stats = dict(snapshot["counts"])
+        if mode == "estimated":
+            stats.update(estimate_row_counts(session, DATA_STATS_COUNTS))
         
-        return {"database_statistics": stats}
+        return {"database_statistics": stats, "mode": mode, "as_of": snapshot["as_of"]}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting statistics: {str(e)}")
 
+@app.get("/admin/cache-stats", tags=["Admin - Data Management"])
+def get_cache_statistics(current_user: User = Depends(require_admin)):
+    """Get hit/miss counters for the in-process caches"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "stats_cache": stats_cache.stats(),
+        "public_cache": public_cache.stats(),
+        "data_stats_refresher": data_stats_refresher.stats(),
+        "entity_versions": entity_versions.stats(),
+    }
+
+@app.get("/admin/password-service-stats", tags=["Admin - Data Management"])
+def get_password_service_statistics(current_user: User = Depends(require_admin)):
+    """Get queue depth and rejection counters for the bcrypt worker pool"""
+    return {"password_service": password_service.stats()}
+
+@app.get("/admin/db-pool-stats", tags=["Admin - Data Management"])
+def get_db_pool_statistics(current_user: User = Depends(require_admin)):
+    """Get checked-out, overflow and checkout wait-time figures for the database pool"""
+    return {"database_pool": get_pool_stats()}
+
+@app.get("/admin/logging-stats", tags=["Admin - Data Management"])
+def get_logging_statistics(current_user: User = Depends(require_admin)):
+    """Get the log level and the queued/dropped record counts of the async log handler"""
+    return {"logging": logging_stats()}
+
 # Admin creation code management
 @app.post("/admin/create-admin", response_model=UserRead, tags=["Admin - Account Management"])
 def create_admin_with_code(
@@ -1967,12 +2480,12 @@ def delete_admin_creation_code(
     return {"message": "Admin creation code deleted successfully"}
 
 # Admin admission request management
-@app.get("/admin/admission-requests", tags=["Admin - Admissions"], response_model=List[AdmissionRequestRead])
+@app.get("/admin/admission-requests", tags=["Admin - Admissions"], response_model=Union[List[AdmissionRequestRead], CursorPage[AdmissionRequestRead]])
 def get_admission_requests(
     status: str = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
     """Get all admission requests (admin only)"""
@@ -1983,15 +2496,14 @@ def get_admission_requests(
     
     if status:
         statement = statement.where(AdmissionRequest.status == status)
+    statement = dates.apply(statement, AdmissionRequest.created_at)
     
-    statement = statement.order_by(AdmissionRequest.created_at.desc())
-    requests = session.exec(statement.offset(skip).limit(limit)).all()
-    return requests
+    return paginate(session, statement, page, [AdmissionRequest.created_at, AdmissionRequest.id], descending=True)
 
 @app.get("/admin/admission-requests/{request_id}", tags=["Admin - Admissions"], response_model=AdmissionRequestRead)
 def get_admission_request(
     request_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(require_admin)
 ):
     """Get a specific admission request (admin only)"""
@@ -2113,247 +2625,223 @@ def delete_admission_request(
 
 # Student-specific endpoints
 @app.get("/student/{student_id}/profile", tags=["Students"], response_model=StudentRead)
-def get_student_profile(
+async def get_student_profile(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(Student, User, Class))
 ):
     """Get student profile with user information"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
-    student = session.get(Student, student_id)
+    await validate_student_access_async(student_id, current_user, session, claims)
+    student = await session.get(Student, student_id, options=STUDENT_READ_OPTIONS)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Load user relationship
-    if student.user_id:
-        user = session.get(User, student.user_id)
-        student.user = user
-    
-    # Load class relationship
-    if student.class_id:
-        class_assigned = session.get(Class, student.class_id)
-        student.class_assigned = class_assigned
-    
     return student
 
-@app.get("/student/{student_id}/attendance", tags=["Students"], response_model=List[AttendanceRead])
-def get_student_attendance(
+@app.get("/student/{student_id}/attendance", tags=["Students"], response_model=Union[List[AttendanceRead], CursorPage[AttendanceRead]])
+async def get_student_attendance(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    page: PageParams = Depends(),
+    dates: DateRange = Depends(),
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(Attendance, Student))
 ):
     """Get all attendance records for a specific student"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
+    await validate_student_access_async(student_id, current_user, session, claims)
     
-    statement = select(Attendance).where(Attendance.student_id == student_id).order_by(Attendance.date.desc())
-    attendance = session.exec(statement).all()
-    return attendance
+    statement = dates.apply(select(Attendance).where(Attendance.student_id == student_id), Attendance.attendance_day)
+    columns = [Attendance.date, Attendance.id]
+    rows = (await session.exec(page_statement(statement, page, columns, descending=True))).all()
+    return page_response(rows, page, columns)
 
 @app.get("/student/{student_id}/exam-results", tags=["Students"], response_model=List[ExamResultRead])
-def get_student_exam_results(
+async def get_student_exam_results(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(ExamResult, Exam, Subject, Class, Student, User))
 ):
     """Get all exam results for a specific student"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
+    await validate_student_access_async(student_id, current_user, session, claims)
     
     # Get exam results with exam and subject information
-    statement = select(ExamResult).options(
-        selectinload(ExamResult.exam).selectinload(Exam.subject)
-    ).where(ExamResult.student_id == student_id)
+    statement = select(ExamResult).options(*EXAM_RESULT_READ_OPTIONS).where(ExamResult.student_id == student_id)
     
-    results = session.exec(statement).all()
+    results = (await session.exec(statement)).all()
     return results
 
 @app.get("/student/{student_id}/subjects", tags=["Students"], response_model=List[SubjectRead])
-def get_student_subjects(
+async def get_student_subjects(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(Subject, Class, Student))
 ):
     """Get all subjects for a student's class"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
+    await validate_student_access_async(student_id, current_user, session, claims)
     
-    # First get the student to find their class
-    student = session.get(Student, student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+    # First get the student's class
+    class_id = await get_student_class_id_async(student_id, session, claims)
     
     # Get subjects for the student's class
-    statement = select(Subject).where(Subject.class_id == student.class_id)
-    subjects = session.exec(statement).all()
+    statement = select(Subject).options(*SUBJECT_READ_OPTIONS).where(Subject.class_id == class_id)
+    subjects = (await session.exec(statement)).all()
     return subjects
 
 @app.get("/student/{student_id}/study-materials", tags=["Students"], response_model=List[StudyMaterialRead])
-def get_student_study_materials(
+async def get_student_study_materials(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(StudyMaterial, Subject, Class, Student))
 ):
     """Get all study materials for a student's subjects"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
-    
-    # First get the student to find their class
-    student = session.get(Student, student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    
-    # Get subjects for the student's class
-    subjects = session.exec(select(Subject).where(Subject.class_id == student.class_id)).all()
+    await validate_student_access_async(student_id, current_user, session, claims)
     
-    if not subjects:
-        return []
-    
-    # Get subject IDs
-    subject_ids = [subject.id for subject in subjects]
+    # First get the student's class
+    class_id = await get_student_class_id_async(student_id, session, claims)
     
-    # Get study materials for those subjects (only public ones)
-    statement = select(StudyMaterial).where(
-        StudyMaterial.subject_id.in_(subject_ids),
+    # Get study materials for the class's subjects (only public ones)
+    class_subject_ids = select(Subject.id).where(Subject.class_id == class_id)
+    statement = select(StudyMaterial).options(*STUDY_MATERIAL_READ_OPTIONS).where(
+        StudyMaterial.subject_id.in_(class_subject_ids),
         StudyMaterial.is_public == True
     ).order_by(StudyMaterial.created_at.desc())
-    materials = session.exec(statement).all()
+    materials = (await session.exec(statement)).all()
     return materials
 
 @app.get("/student/{student_id}/notices", tags=["Students"], response_model=List[NoticeRead])
-def get_student_notices(
+async def get_student_notices(
     student_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_active_user_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(Notice, Student))
 ):
     """Get notices relevant to students"""
     # Validate access
-    validate_student_access(student_id, current_user, session)
+    await validate_student_access_async(student_id, current_user, session, claims)
     
     # Get active notices for students or general notices
     statement = select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == "student") | (Notice.target_role == None)
     ).order_by(Notice.created_at.desc())
-    notices = session.exec(statement).all()
+    notices = (await session.exec(statement)).all()
     return notices
 
 # Teacher-specific endpoints
 @app.get("/teacher/{teacher_id}/profile", tags=["Teachers"], response_model=TeacherRead)
-def get_teacher_profile(
+async def get_teacher_profile(
     teacher_id: int, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher_or_admin)
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(require_teacher_or_admin_async),
+    claims: TokenClaims = Depends(get_token_claims),
+    etag: str = Depends(conditional_get(Teacher, User))
 ):
     """Get teacher profile with user information"""
     # Validate access - teachers can only see their own profile, admins can see any
     if current_user.role == "teacher":
-        teacher = session.get(Teacher, teacher_id)
-        if not teacher or teacher.user_id != current_user.id:
+        if not await is_own_teacher_record_async(teacher_id, current_user, session, claims):
             raise HTTPException(status_code=403, detail="Access denied. You can only view your own profile.")
     
-    teacher = session.get(Teacher, teacher_id)
+    teacher = await session.get(Teacher, teacher_id, options=TEACHER_READ_OPTIONS)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     
-    # Load user relationship
-    if teacher.user_id:
-        user = session.get(User, teacher.user_id)
-        teacher.user = user
-    
     return teacher
 
+def teacher_subject_ids_statement(teacher_id: int):
+    """Distinct subject IDs the teacher is scheduled to teach"""
+    return select(ClassSchedule.subject_id).distinct().where(ClassSchedule.teacher_id == teacher_id)
+
+def teacher_class_ids_statement(teacher_id: int):
+    """Distinct class IDs the teacher is scheduled to teach"""
+    return select(ClassSchedule.class_id).distinct().where(ClassSchedule.teacher_id == teacher_id)
+
 @app.get("/teacher/{teacher_id}/exams", tags=["Teachers"], response_model=List[ExamRead])
-def get_teacher_exams(teacher_id: int, session: Session = Depends(get_session)):
+async def get_teacher_exams(
+    teacher_id: int,
+    session: AsyncSession = Depends(get_async_primary_session),
+    etag: str = Depends(conditional_get(Exam, Subject, Class, ClassSchedule, authenticated=False))
+):
     """Get all exams for subjects taught by a specific teacher"""
-    # First get all subjects taught by this teacher from class schedules
-    teacher_subject_ids = session.exec(
-        select(ClassSchedule.subject_id).distinct().where(ClassSchedule.teacher_id == teacher_id)
-    ).all()
-    
-    if not teacher_subject_ids:
-        return []
-    
-    # subject_ids is already a list of integers
-    subject_ids = teacher_subject_ids
-    
-    # Get exams for those subjects
-    statement = select(Exam).where(Exam.subject_id.in_(subject_ids))
-    exams = session.exec(statement).all()
+    statement = select(Exam).options(*EXAM_READ_OPTIONS).where(
+        Exam.subject_id.in_(teacher_subject_ids_statement(teacher_id))
+    )
+    exams = (await session.exec(statement)).all()
     
     return exams
 
 @app.get("/teacher/{teacher_id}/subjects", tags=["Teachers"], response_model=List[SubjectRead])
-def get_teacher_subjects(teacher_id: int, session: Session = Depends(get_session)):
+async def get_teacher_subjects(
+    teacher_id: int,
+    session: AsyncSession = Depends(get_async_primary_session),
+    etag: str = Depends(conditional_get(Subject, Class, ClassSchedule, authenticated=False))
+):
     """Get all subjects taught by a specific teacher"""
-    # Get distinct subjects from class schedules where teacher is assigned
-    subject_ids = session.exec(
-        select(ClassSchedule.subject_id).distinct().where(ClassSchedule.teacher_id == teacher_id)
-    ).all()
-    
-    if not subject_ids:
-        return []
-    
-    # Get the actual subject objects with class information
-    subjects = session.exec(
-        select(Subject).options(selectinload(Subject.class_assigned)).where(Subject.id.in_(subject_ids))
-    ).all()
+    subjects = (await session.exec(
+        select(Subject).options(*SUBJECT_READ_OPTIONS).where(Subject.id.in_(teacher_subject_ids_statement(teacher_id)))
+    )).all()
     
     return subjects
 
 @app.get("/teacher/{teacher_id}/classes", tags=["Teachers"], response_model=List[ClassRead])
-def get_teacher_classes(teacher_id: int, session: Session = Depends(get_session)):
+async def get_teacher_classes(
+    teacher_id: int,
+    session: AsyncSession = Depends(get_async_primary_session),
+    etag: str = Depends(conditional_get(Class, ClassSchedule, authenticated=False))
+):
     """Get all classes where the teacher is scheduled to teach"""
-    # Get distinct classes where teacher has class schedules
-    class_ids = session.exec(
-        select(ClassSchedule.class_id).distinct().where(ClassSchedule.teacher_id == teacher_id)
-    ).all()
-    
-    if not class_ids:
-        return []
-    
-    # Get the actual class objects
-    classes = session.exec(
-        select(Class).where(Class.id.in_(class_ids))
-    ).all()
+    classes = (await session.exec(
+        select(Class).where(Class.id.in_(teacher_class_ids_statement(teacher_id)))
+    )).all()
     
     return classes
 
 @app.get("/teacher/{teacher_id}/students", tags=["Teachers"], response_model=List[StudentRead])
-def get_teacher_students(teacher_id: int, session: Session = Depends(get_session)):
+async def get_teacher_students(
+    teacher_id: int,
+    session: AsyncSession = Depends(get_async_primary_session),
+    etag: str = Depends(conditional_get(Student, User, Class, ClassSchedule, authenticated=False))
+):
     """Get all students in classes where the teacher is scheduled to teach"""
-    # Get all classes where the teacher is scheduled
-    teacher_classes = get_teacher_classes(teacher_id, session)
-    
-    if not teacher_classes:
-        return []
-    
-    class_ids = [cls.id for cls in teacher_classes]
-    
-    # Get all students in those classes with user relationship
-    statement = select(Student).options(
-        selectinload(Student.user)
-    ).where(Student.class_id.in_(class_ids))
-    students = session.exec(statement).all()
+    statement = select(Student).options(*STUDENT_READ_OPTIONS).where(
+        Student.class_id.in_(teacher_class_ids_statement(teacher_id))
+    )
+    students = (await session.exec(statement)).all()
     
     return students
 
 @app.get("/teacher/{teacher_id}/study-materials", tags=["Teachers"], response_model=List[StudyMaterialRead])
-def get_teacher_study_materials(teacher_id: int, session: Session = Depends(get_session)):
+async def get_teacher_study_materials(
+    teacher_id: int,
+    session: AsyncSession = Depends(get_async_primary_session),
+    etag: str = Depends(conditional_get(StudyMaterial, Subject, Class, Teacher, authenticated=False))
+):
     """Get all study materials uploaded by a specific teacher"""
     # Verify the teacher exists
-    teacher = session.get(Teacher, teacher_id)
+    teacher = await session.get(Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     
     # Get study materials created by this teacher with subject and class information
-    statement = select(StudyMaterial).options(
-        selectinload(StudyMaterial.subject).selectinload(Subject.class_assigned)
-    ).where(
+    statement = select(StudyMaterial).options(*STUDY_MATERIAL_READ_OPTIONS).where(
         StudyMaterial.created_by_id == teacher.user_id
     ).order_by(StudyMaterial.created_at.desc())
-    materials = session.exec(statement).all()
+    materials = (await session.exec(statement)).all()
     
     return materials
 
@@ -2362,17 +2850,16 @@ def upload_teacher_study_material(
     teacher_id: int,
     material_data: StudyMaterialCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher)
+    current_user: User = Depends(require_teacher),
+    claims: TokenClaims = Depends(get_token_claims)
 ):
     """Upload a study material for a subject taught by the teacher"""
     # Verify the teacher is authenticated and matches the teacher_id
-    teacher = session.get(Teacher, teacher_id)
-    if not teacher or teacher.user_id != current_user.id:
+    if not is_own_teacher_record(teacher_id, current_user, session, claims):
         raise HTTPException(status_code=403, detail="Access denied. You can only upload materials for your subjects.")
     
     # Verify the subject is taught by this teacher
-    teacher_subjects = get_teacher_subjects(teacher_id, session)
-    subject_ids = [subject.id for subject in teacher_subjects]
+    subject_ids = session.exec(teacher_subject_ids_statement(teacher_id)).all()
     
     if material_data.subject_id not in subject_ids:
         raise HTTPException(status_code=403, detail="Access denied. You can only upload materials for subjects you teach.")
@@ -2402,12 +2889,12 @@ def update_teacher_study_material(
     material_id: int,
     material_data: StudyMaterialUpdate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher)
+    current_user: User = Depends(require_teacher),
+    claims: TokenClaims = Depends(get_token_claims)
 ):
     """Update a study material uploaded by the teacher"""
     # Verify the teacher is authenticated and matches the teacher_id
-    teacher = session.get(Teacher, teacher_id)
-    if not teacher or teacher.user_id != current_user.id:
+    if not is_own_teacher_record(teacher_id, current_user, session, claims):
         raise HTTPException(status_code=403, detail="Access denied.")
     
     # Get the material
@@ -2445,12 +2932,12 @@ def delete_teacher_study_material(
     teacher_id: int,
     material_id: int,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher)
+    current_user: User = Depends(require_teacher),
+    claims: TokenClaims = Depends(get_token_claims)
 ):
     """Delete a study material uploaded by the teacher"""
     # Verify the teacher is authenticated and matches the teacher_id
-    teacher = session.get(Teacher, teacher_id)
-    if not teacher or teacher.user_id != current_user.id:
+    if not is_own_teacher_record(teacher_id, current_user, session, claims):
         raise HTTPException(status_code=403, detail="Access denied.")
     
     # Get the material
@@ -2484,10 +2971,12 @@ def change_admin_password(
     if not verify_password(password_data.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    # Update password
+    # Update password; existing sessions must log in again
     current_user.password_hash = get_password_hash(password_data.new_password)
     session.add(current_user)
+    revoke_refresh_tokens(current_user.id, session)
     session.commit()
+    principal_cache.invalidate(current_user.username)
     
     return {"message": "Password changed successfully"}
 
@@ -2496,22 +2985,24 @@ def change_teacher_password(
     teacher_id: int,
     password_data: PasswordChangeRequest,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_teacher)
+    current_user: User = Depends(require_teacher),
+    claims: TokenClaims = Depends(get_token_claims)
 ):
     """Change teacher's own password"""
-    # Get teacher record to validate access
-    teacher = session.get(Teacher, teacher_id)
-    if not teacher or teacher.user_id != current_user.id:
+    # Validate access
+    if not is_own_teacher_record(teacher_id, current_user, session, claims):
         raise HTTPException(status_code=403, detail="Access denied. You can only change your own password.")
     
     # Verify current password
     if not verify_password(password_data.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    # Update password
+    # Update password; existing sessions must log in again
     current_user.password_hash = get_password_hash(password_data.new_password)
     session.add(current_user)
+    revoke_refresh_tokens(current_user.id, session)
     session.commit()
+    principal_cache.invalidate(current_user.username)
     
     return {"message": "Password changed successfully"}
 
@@ -2520,22 +3011,24 @@ def change_student_password(
     student_id: int,
     password_data: PasswordChangeRequest,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_student)
+    current_user: User = Depends(require_student),
+    claims: TokenClaims = Depends(get_token_claims)
 ):
     """Change student's own password"""
-    # Get student record to validate access
-    student = session.get(Student, student_id)
-    if not student or student.user_id != current_user.id:
+    # Validate access
+    if not is_own_student_record(student_id, current_user, session, claims):
         raise HTTPException(status_code=403, detail="Access denied. You can only change your own password.")
     
     # Verify current password
     if not verify_password(password_data.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    # Update password
+    # Update password; existing sessions must log in again
     current_user.password_hash = get_password_hash(password_data.new_password)
     session.add(current_user)
+    revoke_refresh_tokens(current_user.id, session)
     session.commit()
+    principal_cache.invalidate(current_user.username)
     
     return {"message": "Password changed successfully"}
 
@@ -2552,12 +3045,15 @@ def update_admin_profile(
         raise HTTPException(status_code=403, detail="Access denied. You can only update your own profile.")
     
     # Update user fields
+    stale_principals = [current_user.username]
     update_data = profile_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(current_user, field, value)
+    stale_principals.append(current_user.username)
     
     session.add(current_user)
     session.commit()
+    principal_cache.invalidate(*stale_principals)
     session.refresh(current_user)
     
     return current_user
@@ -2576,10 +3072,12 @@ def update_teacher_profile(
         raise HTTPException(status_code=403, detail="Access denied. You can only update your own profile.")
     
     # Update user fields if provided
+    stale_principals = [current_user.username]
     if profile_data.user:
         user_data = profile_data.user.dict(exclude_unset=True)
         for field, value in user_data.items():
             setattr(current_user, field, value)
+        stale_principals.append(current_user.username)
     
     # Update teacher fields
     teacher_data = profile_data.dict(exclude={'user'}, exclude_unset=True)
@@ -2589,6 +3087,7 @@ def update_teacher_profile(
     session.add(current_user)
     session.add(teacher)
     session.commit()
+    principal_cache.invalidate(*stale_principals)
     session.refresh(teacher)
     
     return teacher
@@ -2607,15 +3106,21 @@ def update_student_profile(
         raise HTTPException(status_code=403, detail="Access denied. You can only update your own profile.")
     
     # Update user fields if provided
+    stale_principals = [current_user.username]
     if profile_data.user:
         user_data = profile_data.user.dict(exclude_unset=True)
         for field, value in user_data.items():
             setattr(current_user, field, value)
+        stale_principals.append(current_user.username)
     
     # Update student fields
     student_data = profile_data.dict(exclude={'user'}, exclude_unset=True)
     datetime_fields = ['date_of_birth', 'admission_date']
     
+    # A class change makes the class_id claim in the student's tokens stale
+    if student_data.get('class_id') is not None and student_data['class_id'] != student.class_id:
+        revoke_access_tokens(current_user)
+    
     for field, value in student_data.items():
         # Handle datetime field conversion from string to datetime
         if field in datetime_fields:
@@ -2627,6 +3132,7 @@ def update_student_profile(
     session.add(current_user)
     session.add(student)
     session.commit()
+    principal_cache.invalidate(*stale_principals)
     session.refresh(student)
     
     return student
@@ -2650,18 +3156,25 @@ def get_admin_profile(
     
     return admin
 
-def authenticate_user(username: str, password: str, session: Session) -> User:
+def get_user_by_login(username: str, session: Session) -> Optional[User]:
+    """Look up a user by username or email, with role-specific data, in one query"""
+    statement = select(User).options(
+        joinedload(User.student),
+        joinedload(User.teacher)
+    ).where(
+        or_(User.username == username, User.email == username)
+    ).order_by(
+        # A username match wins over another account's email
+        case((User.username == username, 0), else_=1)
+    ).limit(1)
+    return session.exec(statement).first()
+
+async def authenticate_user(username: str, password: str, session: Session) -> Optional[User]:
     """Authenticate a user by username/email and password"""
-    # Try to find user by username first
-    user = session.exec(select(User).where(User.username == username)).first()
-    
-    # If not found by username, try by email
-    if not user:
-        user = session.exec(select(User).where(User.email == username)).first()
-    
+    user = await run_in_threadpool(get_user_by_login, username, session)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await password_service.verify(password, user.password_hash):
         return None
     return user
 
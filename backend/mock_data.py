@@ -1,20 +1,22 @@
 from datetime import datetime, timedelta
 from models import *
-from passlib.context import CryptContext
+from passwords import pwd_context
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Mock data for seeding the database.
+# Nothing expensive runs at import time: bcrypt hashes and the randomly generated
+# attendance/exam results are materialized on first access (see __getattr__ below),
+# which only seed_data.py triggers.
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-# Mock data for seeding the database
-MOCK_USERS = [
+# Plaintext passwords are hashed when MOCK_USERS is first accessed
+MOCK_USER_ACCOUNTS = [
     # Admin users
     {
         "username": "admin",
         "email": "admin@coaching.com",
-        "password_hash": get_password_hash("admin123"),
+        "password": "admin123",
         "full_name": "System Administrator",
         "phone": "1234567890",
         "role": "admin",
@@ -23,7 +25,7 @@ MOCK_USERS = [
     {
         "username": "principal",
         "email": "principal@coaching.com",
-        "password_hash": get_password_hash("principal123"),
+        "password": "principal123",
         "full_name": "Dr. Sarah Johnson",
         "phone": "1234567891",
         "role": "admin",
@@ -34,7 +36,7 @@ MOCK_USERS = [
     {
         "username": "math_teacher",
         "email": "math@coaching.com",
-        "password_hash": get_password_hash("teacher123"),
+        "password": "teacher123",
         "full_name": "Prof. John Smith",
         "phone": "9876543210",
         "role": "teacher",
@@ -43,7 +45,7 @@ MOCK_USERS = [
     {
         "username": "physics_teacher",
         "email": "physics@coaching.com",
-        "password_hash": get_password_hash("teacher123"),
+        "password": "teacher123",
         "full_name": "Dr. Emily Chen",
         "phone": "9876543211",
         "role": "teacher",
@@ -52,7 +54,7 @@ MOCK_USERS = [
     {
         "username": "chemistry_teacher",
         "email": "chemistry@coaching.com",
-        "password_hash": get_password_hash("teacher123"),
+        "password": "teacher123",
         "full_name": "Mr. Robert Davis",
         "phone": "9876543212",
         "role": "teacher",
@@ -61,7 +63,7 @@ MOCK_USERS = [
     {
         "username": "biology_teacher",
         "email": "biology@coaching.com",
-        "password_hash": get_password_hash("teacher123"),
+        "password": "teacher123",
         "full_name": "Ms. Lisa Brown",
         "phone": "9876543213",
         "role": "teacher",
@@ -70,7 +72,7 @@ MOCK_USERS = [
     {
         "username": "english_teacher",
         "email": "english@coaching.com",
-        "password_hash": get_password_hash("teacher123"),
+        "password": "teacher123",
         "full_name": "Mrs. Jennifer Wilson",
         "phone": "9876543214",
         "role": "teacher",
@@ -81,7 +83,7 @@ MOCK_USERS = [
     {
         "username": "student001",
         "email": "alice@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Alice Johnson",
         "phone": "5551234567",
         "role": "student",
@@ -90,7 +92,7 @@ MOCK_USERS = [
     {
         "username": "student002",
         "email": "bob@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Bob Smith",
         "phone": "5551234568",
         "role": "student",
@@ -99,7 +101,7 @@ MOCK_USERS = [
     {
         "username": "student003",
         "email": "charlie@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Charlie Brown",
         "phone": "5551234569",
         "role": "student",
@@ -108,7 +110,7 @@ MOCK_USERS = [
     {
         "username": "student004",
         "email": "diana@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Diana Prince",
         "phone": "5551234570",
         "role": "student",
@@ -117,7 +119,7 @@ MOCK_USERS = [
     {
         "username": "student005",
         "email": "eve@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Eve Martinez",
         "phone": "5551234571",
         "role": "student",
@@ -126,7 +128,7 @@ MOCK_USERS = [
     {
         "username": "student006",
         "email": "frank@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Frank Wilson",
         "phone": "5551234572",
         "role": "student",
@@ -135,7 +137,7 @@ MOCK_USERS = [
     {
         "username": "student007",
         "email": "grace@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Grace Lee",
         "phone": "5551234573",
         "role": "student",
@@ -144,7 +146,7 @@ MOCK_USERS = [
     {
         "username": "student008",
         "email": "henry@student.com",
-        "password_hash": get_password_hash("student123"),
+        "password": "student123",
         "full_name": "Henry Davis",
         "phone": "5551234574",
         "role": "student",
@@ -152,6 +154,19 @@ MOCK_USERS = [
     }
 ]
 
+def build_mock_users():
+    """Hash the mock account passwords (once per distinct password)"""
+    hashes = {}
+    users = []
+    for account in MOCK_USER_ACCOUNTS:
+        user_data = dict(account)
+        password = user_data.pop("password")
+        if password not in hashes:
+            hashes[password] = get_password_hash(password)
+        user_data["password_hash"] = hashes[password]
+        users.append(user_data)
+    return users
+
 MOCK_TEACHERS = [
     {
         "user_id": 3,  # math_teacher
@@ -362,8 +377,6 @@ def generate_attendance_data():
     
     return attendance_data
 
-MOCK_ATTENDANCE = generate_attendance_data()
-
 MOCK_EXAMS = [
     # Class 10A exams
     {"name": "Mid Term Math", "subject_id": 1, "class_id": 1, "exam_date": datetime(2024, 10, 15), "max_marks": 100, "duration_minutes": 120},
@@ -441,8 +454,6 @@ def generate_exam_results():
     
     return results
 
-MOCK_EXAM_RESULTS = generate_exam_results()
-
 MOCK_STUDY_MATERIALS = [
     {"title": "Sample Image", "description": "A sample uploaded image", "subject_id": 1, "created_by_id": 1, "file_path": "study_materials/20251008_052514_1_1.jpg", "file_type": "image/jpeg", "file_size": 53754, "is_public": True}
 ]
@@ -746,4 +757,35 @@ MOCK_CLASS_SCHEDULES = [
 MOCK_ADMIN_CREATION_CODE = {
     "code": "ADMIN2024",
     "is_active": True
-}
\ No newline at end of file
+}
+
+# Lazily materialized datasets, built and memoized on first attribute access
+_LAZY_DATASETS = {
+    "MOCK_USERS": build_mock_users,
+    "MOCK_ATTENDANCE": generate_attendance_data,
+    "MOCK_EXAM_RESULTS": generate_exam_results,
+}
+
+def __getattr__(name):
+    builder = _LAZY_DATASETS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = builder()
+    globals()[name] = value
+    return value
+
+__all__ = [
+    "MOCK_USERS",
+    "MOCK_TEACHERS",
+    "MOCK_CLASSES",
+    "MOCK_STUDENTS",
+    "MOCK_SUBJECTS",
+    "MOCK_ATTENDANCE",
+    "MOCK_EXAMS",
+    "MOCK_EXAM_RESULTS",
+    "MOCK_STUDY_MATERIALS",
+    "MOCK_NOTICES",
+    "MOCK_TEACHER_REVIEWS",
+    "MOCK_CLASS_SCHEDULES",
+    "MOCK_ADMIN_CREATION_CODE",
+]
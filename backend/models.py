@@ -1,7 +1,8 @@
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Index
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 from enum import Enum
+from sqlalchemy import event
 
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -29,12 +30,24 @@ class User(UserBase, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     password_hash: str = Field(max_length=255)
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # Bumped to revoke issued access tokens
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     
     # Relationships
     student: Optional["Student"] = Relationship(back_populates="user")
     teacher: Optional["Teacher"] = Relationship(back_populates="user")
 
+# Refresh tokens issued at login; only the token id (jti) is stored
+class RefreshToken(SQLModel, table=True):
+    __tablename__ = "refresh_tokens"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(max_length=64, unique=True, index=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = Field(default=None)
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
 # User creation/response models
 class UserCreate(UserBase):
     password: Optional[str] = Field(default=None, min_length=6, max_length=50)  # Made optional for auto-generation
@@ -55,7 +68,7 @@ class Student(StudentBase, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", unique=True)
-    class_id: int = Field(foreign_key="classes.id")
+    class_id: int = Field(foreign_key="classes.id", index=True)
     admission_date: Optional[datetime] = Field(default_factory=datetime.utcnow)
     
     # Relationships
@@ -136,7 +149,7 @@ class Subject(SubjectBase, table=True):
     __tablename__ = "subjects"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    class_id: int = Field(foreign_key="classes.id")
+    class_id: int = Field(foreign_key="classes.id", index=True)
     
     # Relationships
     class_assigned: Optional[Class] = Relationship(back_populates="subjects")
@@ -180,6 +193,14 @@ class ClassSchedule(ClassScheduleBase, table=True):
     subject: Optional[Subject] = Relationship()
     class_assigned: Optional[Class] = Relationship()
     teacher: Optional[Teacher] = Relationship()
+    
+    # Teacher/student timetables and the conflict check filter by owner and day, ordered by time;
+    # keyset pages of /admin/class-schedules walk (day, time, id)
+    __table_args__ = (
+        Index("ix_class_schedules_teacher_day_start", "teacher_id", "day_of_week", "start_time"),
+        Index("ix_class_schedules_class_day_start", "class_id", "day_of_week", "start_time"),
+        Index("ix_class_schedules_day_start_id", "day_of_week", "start_time", "id"),
+    )
 
 class ClassScheduleCreate(ClassScheduleBase):
     subject_id: int
@@ -201,16 +222,39 @@ class AttendanceBase(SQLModel):
     status: str  # Changed from AttendanceStatus to str
     remarks: Optional[str] = Field(default=None)
 
+def attendance_day_default(context):
+    """Column default for Core inserts that only supply the timestamp"""
+    value = context.get_current_parameters().get("date")
+    return value.date() if isinstance(value, datetime) else None
+
 class Attendance(AttendanceBase, table=True):
     __tablename__ = "attendances"
     
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key="students.id")
     class_id: int = Field(foreign_key="classes.id")
+    # Calendar day of `date`, stored so day filters are plain (indexable) equality checks
+    attendance_day: Optional[date] = Field(default=None, sa_column_kwargs={"default": attendance_day_default})
     
     # Relationships
     student: Optional[Student] = Relationship(back_populates="attendances")
     class_session: Optional[Class] = Relationship(back_populates="attendances")
+    
+    # One mark per student, class and day (also the upsert conflict target); class registers lead with class_id.
+    # Listings are paged newest first by (date, id), so each filter they take has an index ending in that order.
+    __table_args__ = (
+        Index("ux_attendances_student_class_day", "student_id", "class_id", "attendance_day", unique=True),
+        Index("ix_attendances_class_day_date_id", "class_id", "attendance_day", "date", "id"),
+        Index("ix_attendances_class_date_id", "class_id", "date", "id"),
+        Index("ix_attendances_student_date_id", "student_id", "date", "id"),
+        Index("ix_attendances_date_id", "date", "id"),  # keyset pages of /admin/attendance
+    )
+
+# Keep attendance_day in step whenever an ORM instance's timestamp is assigned
+@event.listens_for(Attendance.date, "set")
+def sync_attendance_day(target, value, oldvalue, initiator):
+    if isinstance(value, datetime):
+        target.attendance_day = value.date()
 
 class AttendanceCreate(AttendanceBase):
     student_id: int
@@ -231,13 +275,17 @@ class Exam(ExamBase, table=True):
     __tablename__ = "exams"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    subject_id: int = Field(foreign_key="subjects.id")
+    subject_id: int = Field(foreign_key="subjects.id", index=True)
     class_id: int = Field(foreign_key="classes.id")
     
     # Relationships
     subject: Optional[Subject] = Relationship(back_populates="exams")
     class_assigned: Optional[Class] = Relationship(back_populates="exams")
     results: List["ExamResult"] = Relationship(back_populates="exam")
+    
+    __table_args__ = (
+        Index("ix_exams_date_id", "exam_date", "id"),  # keyset pages of /admin/exams
+    )
 
 class ExamCreate(ExamBase):
     subject_id: int
@@ -260,7 +308,7 @@ class ExamResult(ExamResultBase, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     exam_id: int = Field(foreign_key="exams.id")
-    student_id: int = Field(foreign_key="students.id")
+    student_id: int = Field(foreign_key="students.id", index=True)
     
     # Relationships
     exam: Optional[Exam] = Relationship(back_populates="results")
@@ -302,6 +350,15 @@ class StudyMaterial(StudyMaterialBase, table=True):
     # Relationships
     subject: Optional[Subject] = Relationship(back_populates="study_materials")
     created_by: Optional[User] = Relationship()
+    
+    # Student listings filter by subject and visibility; teacher listings by uploader; both newest first.
+    # Keyset pages of /admin/study-materials walk (created_at, id), optionally within a subject.
+    __table_args__ = (
+        Index("ix_study_materials_subject_public_created", "subject_id", "is_public", "created_at"),
+        Index("ix_study_materials_created_by_created", "created_by_id", "created_at"),
+        Index("ix_study_materials_subject_created_id", "subject_id", "created_at", "id"),
+        Index("ix_study_materials_created_id", "created_at", "id"),
+    )
 
 class StudyMaterialCreate(StudyMaterialBase):
     subject_id: int
@@ -332,9 +389,14 @@ class Notice(NoticeBase, table=True):
     
     # Relationships
     created_by: Optional[User] = Relationship()
+    
+    # Notice boards list active notices for a role, newest first
+    __table_args__ = (
+        Index("ix_notices_active_target_created", "is_active", "target_role", "created_at"),
+    )
 
 class NoticeCreate(NoticeBase):
-    pass
+    created_by_id: Optional[int] = None  # Set from the signed-in admin
 
 class NoticeRead(NoticeBase):
     id: int
@@ -359,6 +421,12 @@ class TeacherReview(TeacherReviewBase, table=True):
     # Relationships
     teacher: Optional[Teacher] = Relationship(back_populates="reviews")
     reviewed_by: Optional[User] = Relationship()
+    
+    # Keyset pages of /admin/teacher-reviews walk (review_date, id), optionally for one teacher
+    __table_args__ = (
+        Index("ix_teacher_reviews_teacher_date_id", "teacher_id", "review_date", "id"),
+        Index("ix_teacher_reviews_date_id", "review_date", "id"),
+    )
 
 class TeacherReviewCreate(TeacherReviewBase):
     teacher_id: int
@@ -399,6 +467,12 @@ class AdmissionRequest(AdmissionRequestBase, table=True):
     # Relationships
     class_assigned: Optional["Class"] = Relationship()
     reviewed_by: Optional[User] = Relationship()
+    
+    # Newest-first review queue, optionally filtered by status (also the keyset order)
+    __table_args__ = (
+        Index("ix_admission_requests_status_created", "status", "created_at", "id"),
+        Index("ix_admission_requests_created_id", "created_at", "id"),
+    )
 
 class AdmissionRequestCreate(AdmissionRequestBase):
     pass
@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Date, DateTime, tuple_
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+
+
+def _temporal_type(column):
+    """datetime or date for timestamp/date columns, None for anything else"""
+    if isinstance(column.type, DateTime):
+        return datetime
+    if isinstance(column.type, Date):
+        return date
+    return None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """One page of a keyset-paginated listing; pass next_cursor back as ?cursor= for the next page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    """Query parameters shared by every list endpoint.
+
+    Offset mode (skip/limit) returns a plain list, as these endpoints always have.
+    Passing cursor (empty for the first page) switches to keyset mode and a CursorPage.
+    limit is capped at MAX_PAGE_SIZE in both modes.
+    """
+
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page; empty for the first page"),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+
+
+class DateRange:
+    """Optional inclusive from_date/to_date filter on an endpoint's date or timestamp column"""
+
+    def __init__(self, from_date: Optional[date] = None, to_date: Optional[date] = None):
+        if from_date and to_date and from_date > to_date:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from_date must not be after to_date")
+        self.from_date = from_date
+        self.to_date = to_date
+
+    @property
+    def active(self) -> bool:
+        return self.from_date is not None or self.to_date is not None
+
+    def apply(self, statement, column):
+        # Half-open bounds on timestamps so the whole of to_date is included and the index stays usable
+        is_timestamp = _temporal_type(column) is datetime
+        if self.from_date:
+            lower = datetime.combine(self.from_date, time.min) if is_timestamp else self.from_date
+            statement = statement.where(column >= lower)
+        if self.to_date:
+            if is_timestamp:
+                statement = statement.where(column < datetime.combine(self.to_date + timedelta(days=1), time.min))
+            else:
+                statement = statement.where(column <= self.to_date)
+        return statement
+
+
+def _dump(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+def _load(value, column):
+    python_type = _temporal_type(column)
+    if python_type and isinstance(value, str):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """Turn an opaque cursor back into typed sort-key values; 400 if it was not issued for these columns"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of sort keys")
+        return [_load(value, column) for value, column in zip(values, columns)]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def page_statement(statement, page: PageParams, columns: Sequence, descending: bool = False):
+    """Order by `columns` (the last one must be unique, e.g. the id) and cut out the requested page.
+
+    Keyset mode filters with a row-value comparison on the sort keys, so with an index on
+    them each page costs the same however deep it is, unlike OFFSET. It fetches one extra
+    row to learn whether there is a next page.
+    """
+    order = [column.desc() if descending else column.asc() for column in columns]
+    if page.cursor is None:
+        return statement.order_by(*order).offset(page.skip).limit(page.limit)
+
+    if page.cursor:
+        key, position = tuple_(*columns), tuple_(*decode_cursor(page.cursor, columns))
+        statement = statement.where(key < position if descending else key > position)
+    return statement.order_by(*order).limit(page.limit + 1)
+
+
+def page_response(rows, page: PageParams, columns: Sequence):
+    """The list itself in offset mode; items plus next_cursor in keyset mode"""
+    if page.cursor is None:
+        return rows
+
+    items = rows[:page.limit]
+    next_cursor = None
+    if len(rows) > page.limit:
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def paginate(session, statement, page: PageParams, columns: Sequence, descending: bool = False):
+    """page_statement + page_response for a sync session"""
+    rows = session.exec(page_statement(statement, page, columns, descending)).all()
+    return page_response(rows, page, columns)
@@ -0,0 +1,260 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from log import get_logger
+
+logger = get_logger("passwords")
+
+# Password hashing context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Worker-side functions (module level so they can be pickled to the pool)
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class _Waiter:
+    """A caller waiting for an admission slot; granted under the service lock"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.event = threading.Event()
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+
+    def grant(self) -> bool:
+        if self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                return False  # its event loop is gone; nobody will take the slot
+        self.granted = True
+        self.event.set()
+        return True
+
+    def _wake(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class PasswordService:
+    """Runs bcrypt hashing and verification in a dedicated, size-limited process pool.
+
+    At most ``max_pending`` operations may be in flight at once. Further callers wait,
+    in arrival order, up to ``queue_timeout`` seconds for a slot and are then rejected
+    with a 503, so a login burst is absorbed but cannot tie up the threadpool that
+    serves every other route indefinitely. With ``max_workers=0`` the work
+    runs inline in the calling thread (still subject to the same admission limit).
+    If a worker dies, the broken pool is replaced and the operation retried once;
+    a second failure is answered with the same 503.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, queue_timeout: float = 5.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork the (multi-threaded) API process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a pool whose worker died; the next call starts a fresh one"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another caller already replaced it
+            self._executor = None
+            self.restarts += 1
+        logger.warning("Password worker pool broken; restarting it", extra={"restarts": self.restarts})
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _unavailable() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password service is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        """Take a free slot, or queue `waiter` for one (call with the lock held)"""
+        if self._in_flight < self.max_pending and not self._waiters:
+            self._in_flight += 1
+            return True
+        if self.queue_timeout <= 0:
+            self.rejected += 1
+            raise self._unavailable()
+        self._waiters.append(waiter)
+        return False
+
+    def _give_up(self, waiter: _Waiter, timed_out: bool) -> bool:
+        """After a wait ended without the caller seeing its grant: True if the slot was
+        granted meanwhile, otherwise leave the queue (call with the lock held)"""
+        if waiter.granted:
+            return True
+        self._waiters.remove(waiter)
+        if timed_out:
+            self.rejected += 1
+        return False
+
+    def _acquire(self) -> None:
+        waiter = _Waiter()
+        with self._lock:
+            if self._try_acquire(waiter):
+                return
+        if waiter.event.wait(self.queue_timeout):
+            return
+        with self._lock:
+            if self._give_up(waiter, timed_out=True):
+                return
+        raise self._unavailable()
+
+    async def _acquire_async(self) -> None:
+        waiter = _Waiter(asyncio.get_running_loop())
+        with self._lock:
+            if self._try_acquire(waiter):
+                return
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+            return
+        except asyncio.TimeoutError:
+            with self._lock:
+                if self._give_up(waiter, timed_out=True):
+                    return
+            raise self._unavailable()
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = self._give_up(waiter, timed_out=False)
+            if granted:
+                self._free_slot()
+            raise
+
+    def _free_slot(self) -> None:
+        with self._lock:
+            while self._waiters:
+                # Hand the slot straight to the next waiter so nobody can barge in
+                if self._waiters.popleft().grant():
+                    return
+            self._in_flight -= 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.completed += 1
+        self._free_slot()
+
+    def _run(self, fn, *args):
+        self._acquire()
+        try:
+            for _ in range(2):
+                executor = self._get_executor()
+                if executor is None:
+                    return fn(*args)
+                try:
+                    return executor.submit(fn, *args).result()
+                except BrokenProcessPool:
+                    self._discard_executor(executor)
+            raise self._unavailable()
+        finally:
+            self._release()
+
+    async def _run_async(self, fn, *args):
+        await self._acquire_async()
+        future = None
+        release_later = False
+        try:
+            for _ in range(2):
+                executor = self._get_executor()
+                if executor is None:
+                    future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+                    return await asyncio.shield(future)
+                try:
+                    future = executor.submit(fn, *args)
+                    return await asyncio.wrap_future(future)
+                except BrokenProcessPool:
+                    self._discard_executor(executor)
+            raise self._unavailable()
+        except asyncio.CancelledError:
+            # The caller is gone (client disconnected) but the job keeps running: its slot
+            # is freed when the job finishes. A job cancelled before it started finishes
+            # right away, so its slot is freed too.
+            if future is not None and not future.done():
+                future.add_done_callback(lambda _: self._release())
+                release_later = True
+            raise
+        finally:
+            if not release_later:
+                self._release()
+
+    # Async API (for async def handlers)
+    async def hash(self, password: str) -> str:
+        return await self._run_async(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run_async(_verify, plain_password, hashed_password)
+
+    # Blocking API (for sync handlers already running in the threadpool)
+    def hash_sync(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queue_timeout_seconds": self.queue_timeout,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - max(self.max_workers, 1)),
+                "waiting": len(self._waiters),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(2, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", max(PASSWORD_HASH_WORKERS, 1) * 4))
+# Seconds a caller waits for an admission slot before the 503 (0 rejects at once)
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+password_service = PasswordService(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,84 @@
+from functools import cached_property
+from typing import Callable, List
+
+from fastapi.responses import ORJSONResponse
+from pydantic_core import PydanticUndefined
+from sqlalchemy import inspect
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+
+class Projection:
+    """A Read model built straight from table columns, for list endpoints that skip re-validation.
+
+    statement() selects only the columns the Read model exposes and outer-joins each
+    nested relation, so a page is one query with no ORM objects. dicts() turns the rows
+    into dicts in the Read model's field order. The values are typed by the columns the
+    Read model mirrors, so they are already valid and go to orjson without a pydantic pass.
+    Fields that are neither a column nor a listed relation get the Read model's default.
+    """
+
+    def __init__(self, read_model, entity, **relations: "Projection"):
+        self.read_model = read_model
+        self.entity = entity
+        self.relations = relations
+        mapper = inspect(entity)
+        self._columns = {prop.key for prop in mapper.column_attrs}
+        self._primary_key = mapper.primary_key[0].key
+        for name, field in read_model.model_fields.items():
+            if name not in relations and name not in self._columns and field.default is PydanticUndefined:
+                raise ValueError(f"{read_model.__name__}.{name} is not a column of {entity.__name__}")
+
+    def _plan(self, source, prefix: str, columns: list, joins: list) -> Callable:
+        def add_column(name: str) -> int:
+            columns.append(getattr(source, name).label(prefix + name))
+            return len(columns) - 1
+
+        fields = []
+        for name, field in self.read_model.model_fields.items():
+            if name in self.relations:
+                nested = self.relations[name]
+                target = aliased(nested.entity)
+                joins.append((target, getattr(source, name).of_type(target)))
+                fields.append((name, None, nested._plan(target, f"{prefix}{name}__", columns, joins), None))
+            elif name in self._columns:
+                fields.append((name, add_column(name), None, None))
+            else:
+                fields.append((name, None, None, field.default))
+        key = next((index for name, index, _, _ in fields if name == self._primary_key), None)
+        if key is None:
+            key = add_column(self._primary_key)
+
+        def build(row):
+            if row[key] is None:
+                return None  # outer join found no related row
+            return {
+                name: row[index] if index is not None else build_nested(row) if build_nested else default
+                for name, index, build_nested, default in fields
+            }
+        return build
+
+    @cached_property
+    def _compiled(self):
+        columns, joins = [], []
+        build = self._plan(self.entity, "", columns, joins)
+        statement = select(*columns).select_from(self.entity)
+        for target, relationship in joins:
+            statement = statement.outerjoin(target, relationship)
+        return statement, build
+
+    def statement(self):
+        """SELECT of the projected columns; the root entity is not aliased, so filters, ordering
+        and page_statement() use its columns as usual"""
+        return self._compiled[0]
+
+    def dicts(self, rows) -> List[dict]:
+        build = self._compiled[1]
+        return [build(row) for row in rows]
+
+    def response(self, result) -> ORJSONResponse:
+        """Response for page_response() output over projected rows; returning a Response
+        bypasses the route's response_model"""
+        if isinstance(result, dict):
+            return ORJSONResponse({"items": self.dicts(result["items"]), "next_cursor": result["next_cursor"]})
+        return ORJSONResponse(self.dicts(result))
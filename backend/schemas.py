@@ -1,11 +1,11 @@
 # Since we're using SQLModel, most schemas are now in models.py
 # This file contains only additional utility schemas that don't correspond to database tables
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 from fastapi import UploadFile
-from models import UserRole, UserCreate
+from models import UserRole, UserCreate, AttendanceRead, AttendanceStatus
 
 # Login schema
 class LoginRequest(BaseModel):
@@ -16,10 +16,28 @@ class LoginRequest(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+# Claims carried by signed access tokens
+class TokenClaims(BaseModel):
+    sub: str  # username
+    uid: Optional[int] = None
+    role: Optional[str] = None
+    tv: int = 0  # must match User.token_version, otherwise the token is revoked
+    student_id: Optional[int] = None
+    teacher_id: Optional[int] = None
+    class_id: Optional[int] = None
 
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
     user: dict  # Will contain user info with role-specific data
 
 # Performance/Analytics schemas
@@ -87,6 +105,28 @@ class AttendanceUpdate(BaseModel):
     status: Optional[str] = None
     remarks: Optional[str] = None
 
+# One entry of PUT /admin/attendance/bulk; the web client sends the id as attendanceId
+class AttendanceBulkUpdate(BaseModel):
+    id: int = Field(validation_alias=AliasChoices("id", "attendanceId", "attendance_id"))
+    status: Optional[AttendanceStatus] = None
+    remarks: Optional[str] = None
+    date: Optional[datetime] = None
+    student_id: Optional[int] = None
+    class_id: Optional[int] = None
+
+    # Omitted fields keep their value; only remarks may be cleared with an explicit null
+    @field_validator("status", "date", "student_id", "class_id")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+# Result of an attendance upsert: rows that were new vs rows that were overwritten
+class AttendanceUpsertResult(BaseModel):
+    inserted: List[AttendanceRead]
+    updated: List[AttendanceRead]
+
 class ExamUpdate(BaseModel):
     name: Optional[str] = None
     exam_date: Optional[str] = None
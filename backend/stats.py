@@ -0,0 +1,143 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import bindparam, func, literal, text, union_all
+from sqlmodel import Session, select
+
+from log import get_logger
+
+logger = get_logger("stats")
+
+
+def count_rows(session: Session, models: dict) -> dict:
+    """Exact row counts for several tables in one statement:
+    SELECT 'a', count(*) FROM a UNION ALL SELECT 'b', count(*) FROM b ...
+    """
+    statement = union_all(*(
+        select(literal(label).label("name"), func.count().label("rows")).select_from(model)
+        for label, model in models.items()
+    ))
+    counts = {name: rows for name, rows in session.exec(statement).all()}
+    return {label: counts[label] for label in models}
+
+
+def estimate_row_counts(session: Session, models: dict) -> dict:
+    """Row counts from the planner statistics, without touching the tables.
+
+    PostgreSQL keeps pg_class.reltuples up to date through (auto)vacuum/analyze; SQLite
+    only has sqlite_stat1 after ANALYZE. Tables without statistics are left out.
+    """
+    tables = {model.__tablename__: label for label, model in models.items()}
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        statement = text(
+            "SELECT c.relname, c.reltuples FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p') AND c.relname IN :tables"
+        ).bindparams(bindparam("tables", expanding=True))
+        # reltuples is -1 for tables that have never been vacuumed or analyzed
+        rows = [(name, int(estimate)) for name, estimate in session.exec(statement, params={"tables": list(tables)})
+                if estimate >= 0]
+    elif dialect == "sqlite":
+        has_stats = session.exec(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")).first()
+        if not has_stats:
+            return {}
+        statement = text("SELECT tbl, stat FROM sqlite_stat1 WHERE tbl IN :tables").bindparams(
+            bindparam("tables", expanding=True))
+        # The first number of every stat row is the table's row count
+        rows = [(name, int(stat.split()[0])) for name, stat in session.exec(statement, params={"tables": list(tables)})]
+    else:
+        return {}
+
+    estimates = {}
+    for name, estimate in rows:
+        label = tables[name]
+        estimates[label] = max(estimate, estimates.get(label, 0))
+    return estimates
+
+
+class CountRefresher:
+    """Recounts a set of tables on a background thread and keeps the latest snapshot.
+
+    The snapshot is refreshed every ``interval`` seconds, and soon after mark_stale()
+    (called when one of the tables is written), but never more often than
+    ``min_interval``. Readers get the last snapshot immediately and never wait for a count.
+    """
+
+    def __init__(self, name: str, session_factory: Callable[[], Session], models: dict,
+                 interval: float = 300.0, min_interval: float = 2.0):
+        self.name = name
+        self.session_factory = session_factory
+        self.models = models
+        self.interval = interval
+        self.min_interval = min_interval
+        self._snapshot: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.last_duration_ms = 0.0
+
+    def refresh(self) -> Dict:
+        started = time.perf_counter()
+        with self.session_factory() as session:
+            counts = count_rows(session, self.models)
+        snapshot = {"counts": counts, "as_of": datetime.utcnow()}
+        with self._lock:
+            self._snapshot = snapshot
+            self.refreshes += 1
+            self.last_duration_ms = (time.perf_counter() - started) * 1000
+        return snapshot
+
+    def snapshot(self) -> Dict:
+        """The latest counts; computed inline only if no refresh has completed yet"""
+        with self._lock:
+            snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.refresh()
+
+    def mark_stale(self) -> None:
+        if self._thread is None:
+            # No background thread: drop the snapshot so the next reader recounts
+            with self._lock:
+                self._snapshot = None
+        else:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Background count refresh failed", extra={"refresher": self.name})
+            self._stop.wait(self.min_interval)
+            self._wake.wait(max(0.0, self.interval - self.min_interval))
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "running": self._thread is not None,
+                "interval_seconds": self.interval,
+                "refreshes": self.refreshes,
+                "last_duration_ms": round(self.last_duration_ms, 3),
+                "as_of": snapshot["as_of"].isoformat() if snapshot else None,
+            }
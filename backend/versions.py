@@ -0,0 +1,64 @@
+import hashlib
+import os
+import secrets
+import threading
+import time
+from typing import Iterable, Optional
+
+# Longest time a worker keeps answering 304 for a validator it issued; bounds staleness
+# when another worker process committed the write
+ETAG_MAX_AGE_SECONDS = float(os.getenv("ETAG_MAX_AGE_SECONDS", 60))
+
+
+class VersionCounters:
+    """Monotonically increasing version per table, bumped whenever a write to it commits.
+
+    An ETag derived from the versions of the tables behind a response can be computed
+    and compared before any query runs. Counters are per worker process: validators are
+    keyed with a per-process secret (so they only match where they were issued, and
+    cannot be forged for another user's resource) and roll over every max_age seconds,
+    which bounds how long writes made by another worker can go unnoticed.
+    """
+
+    def __init__(self, max_age: float = ETAG_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._versions = {}
+        self._unknown = 0  # bumped by writes to tables that could not be identified
+        self._lock = threading.Lock()
+        self._key = secrets.token_bytes(32)
+
+    def bump(self, tables: Iterable[Optional[str]]) -> None:
+        with self._lock:
+            for table in tables:
+                if table is None:
+                    self._unknown += 1
+                else:
+                    self._versions[table] = self._versions.get(table, 0) + 1
+
+    def versions(self, tables: Iterable[str]) -> tuple:
+        with self._lock:
+            return (self._unknown,) + tuple(self._versions.get(table, 0) for table in tables)
+
+    def etag(self, tables: Iterable[str], *parts) -> str:
+        """Weak validator for the current versions of `tables` plus whatever identifies the
+        response (principal, path, query)"""
+        epoch = int(time.time() // self.max_age) if self.max_age > 0 else 0
+        raw = repr((epoch, self.versions(sorted(tables)), parts)).encode()
+        return f'W/"{hashlib.blake2b(raw, key=self._key, digest_size=16).hexdigest()}"'
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_age_seconds": self.max_age, "unknown": self._unknown, "tables": dict(self._versions)}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check with weak comparison (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+entity_versions = VersionCounters()
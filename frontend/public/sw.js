@@ -21,6 +21,12 @@ const API_CACHE_PATTERNS = [
   /\/student\/.*\/profile$/
 ]
 
+// Unauthenticated landing-page data; may live on the API origin. The network fetch
+// goes through the HTTP cache (Cache-Control/ETag), the runtime cache is the offline copy
+const PUBLIC_API_PATTERNS = [
+  /\/public\/(notices|classes)$/
+]
+
 // Install event - cache static assets
 self.addEventListener('install', (event) => {
   event.waitUntil(
@@ -62,6 +68,11 @@ self.addEventListener('fetch', (event) => {
   const { request } = event
   const url = new URL(request.url)
 
+  if (request.method === 'GET' && isPublicAPIRequest(url)) {
+    event.respondWith(networkFirst(request))
+    return
+  }
+
   // Skip cross-origin requests
   if (url.origin !== location.origin) {
     return
@@ -167,6 +178,10 @@ function isAPIRequest(url) {
   return url.includes('/api/') || API_CACHE_PATTERNS.some(pattern => pattern.test(url))
 }
 
+function isPublicAPIRequest(url) {
+  return PUBLIC_API_PATTERNS.some(pattern => pattern.test(url.pathname))
+}
+
 function isHTMLRequest(request) {
   return request.headers.get('Accept')?.includes('text/html')
 }
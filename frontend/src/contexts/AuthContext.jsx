@@ -28,6 +28,16 @@ export const AuthProvider = ({ children }) => {
     try {
       const userName = user?.full_name || user?.username || 'User'
       
+      // Revoke the refresh token server-side (best effort)
+      const refreshToken = tokenManager.getRefreshToken()
+      if (refreshToken) {
+        fetch(`${config.api.baseURL}/auth/logout`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken })
+        }).catch((error) => Logger.warn('Logout request failed:', error))
+      }
+      
       // Clear all auth data
       tokenManager.clearAuth()
       
@@ -47,10 +57,18 @@ export const AuthProvider = ({ children }) => {
   }, [user])
 
   // Token monitoring and validation
-  const checkTokenStatus = useCallback(() => {
+  const checkTokenStatus = useCallback(async () => {
     const tokenStatus = tokenManager.validateToken()
     
-    if (!tokenStatus.isValid) {
+    // Renew short-lived access tokens silently while the refresh token is valid
+    if ((!tokenStatus.isValid || tokenStatus.isExpiringSoon) && tokenManager.getRefreshToken()) {
+      const newToken = await tokenManager.refreshAccessToken()
+      if (newToken) {
+        return true
+      }
+    }
+    
+    if (!tokenManager.validateToken().isValid) {
       // Token is expired or invalid
       if (isAuthenticated) {
         const userName = user?.full_name || user?.username || 'User'
@@ -137,10 +155,10 @@ export const AuthProvider = ({ children }) => {
       const response = await apiLogin(credentials, rememberMe)
       
       if (response.success) {
-        const { user: userData, token } = response.data
+        const { user: userData, token, refreshToken } = response.data
         
         // Store token and user data with remember me preference
-        tokenManager.storeToken(token, userData, rememberMe)
+        tokenManager.storeToken(token, userData, rememberMe, refreshToken)
         
         // Update state
         setUser(userData)
@@ -192,28 +210,10 @@ export const AuthProvider = ({ children }) => {
   // Refresh session (for extending expiring tokens)
   const refreshSession = async () => {
     try {
-      const currentToken = tokenManager.getToken()
-      if (!currentToken) {
-        throw new Error('No token available to refresh')
-      }
+      // Exchange the refresh token for a new access token
+      const newToken = await tokenManager.refreshAccessToken()
 
-      // Try to get a new token by calling the auth/me endpoint
-      const response = await fetch(`${config.api.baseURL}/auth/me`, {
-        headers: {
-          'Authorization': `Bearer ${currentToken}`,
-          'Content-Type': 'application/json'
-        }
-      })
-
-      if (response.ok) {
-        // If the current token is still valid, we can continue using it
-        // In a real implementation, you might want to call a specific refresh endpoint
-        const userData = await response.json()
-        
-        // Update user data and reset warning flag
-        setUser(userData)
-        tokenManager.storeToken(currentToken, userData, tokenManager.isRememberMeEnabled())
-        
+      if (newToken) {
         toast.success('Session refreshed successfully!')
         return true
       } else {
@@ -339,7 +339,8 @@ const apiLogin = async (credentials, rememberMe = false) => {
       success: true,
       data: {
         user: data.user,
-        token: data.access_token
+        token: data.access_token,
+        refreshToken: data.refresh_token
       }
     }
   } catch (error) {
@@ -2,6 +2,7 @@ import axios from 'axios'
 import Logger from '../utils/logger.js'
 import config from '../config/index.js'
 import monitoringService from '../utils/monitoringService.js'
+import tokenManager from '../utils/tokenManager.js'
 
 // Create axios instance with base configuration
 const api = axios.create({
@@ -46,7 +47,7 @@ api.interceptors.response.use(
     }
     return response
   },
-  (error) => {
+  async (error) => {
     // Track failed API calls
     if (error.config?.metadata) {
       const duration = Date.now() - error.config.metadata.startTime
@@ -61,6 +62,17 @@ api.interceptors.response.use(
 
     Logger.error('API Error:', error)
     
+    // Expired access token: renew it once with the refresh token and retry
+    const originalRequest = error.config
+    if (error.response?.status === 401 && originalRequest && !originalRequest._retry) {
+      originalRequest._retry = true
+      const newToken = await tokenManager.refreshAccessToken()
+      if (newToken) {
+        originalRequest.headers.Authorization = `Bearer ${newToken}`
+        return api(originalRequest)
+      }
+    }
+    
     // Handle authentication errors (but don't auto-redirect to avoid loops)
     if (error.response?.status === 401) {
       // Token is invalid or expired - let AuthContext handle this
@@ -80,6 +92,24 @@ api.interceptors.response.use(
   }
 )
 
+// List endpoints return one page at a time (100 rows unless a limit is given). For
+// callers that need the whole list, follow next_cursor until the last page and hand
+// back the usual response with every row in response.data.
+// LIST_PAGE_SIZE must not exceed the backend's MAX_PAGE_SIZE (500 by default).
+const LIST_PAGE_SIZE = 500
+
+const fetchAllPages = async (url, params = {}) => {
+  const items = []
+  let cursor = ''
+  let response
+  do {
+    response = await api.get(url, { params: { ...params, limit: LIST_PAGE_SIZE, cursor } })
+    items.push(...response.data.items)
+    cursor = response.data.next_cursor
+  } while (cursor)
+  return { ...response, data: items }
+}
+
 // Admin API functions
 export const adminAPI = {
   // Dashboard
@@ -112,7 +142,7 @@ export const adminAPI = {
   deleteClass: (classId) => api.delete(`/admin/classes/${classId}`),
   
   // Subjects
-  getSubjects: () => api.get('/admin/subjects'),
+  getSubjects: () => fetchAllPages('/admin/subjects'),
   createSubject: (subjectData) => api.post('/admin/subjects', subjectData),
   updateSubject: (subjectId, subjectData) => api.put(`/admin/subjects/${subjectId}`, subjectData),
   deleteSubject: (subjectId) => api.delete(`/admin/subjects/${subjectId}`),
@@ -133,53 +163,47 @@ export const adminAPI = {
   updateBulkAttendance: (attendanceArray) => api.put('/admin/attendance/bulk', attendanceArray),
   
   // Exams
-  getExams: () => api.get('/admin/exams'),
+  getExams: () => fetchAllPages('/admin/exams'),
   createExam: (examData) => api.post('/admin/exams', examData),
   updateExam: (examId, examData) => api.put(`/admin/exams/${examId}`, examData),
   deleteExam: (examId) => api.delete(`/admin/exams/${examId}`),
   
   // Exam Results
   getExamResults: (params = {}) => {
-    const queryParams = new URLSearchParams()
-    if (params.exam_id) queryParams.append('exam_id', params.exam_id)
-    if (params.student_id) queryParams.append('student_id', params.student_id)
-    return api.get(`/admin/exam-results?${queryParams}`)
+    const queryParams = {}
+    if (params.exam_id) queryParams.exam_id = params.exam_id
+    if (params.student_id) queryParams.student_id = params.student_id
+    return fetchAllPages('/admin/exam-results', queryParams)
   },
   createExamResult: (resultData) => api.post('/admin/exam-results', resultData),
   updateExamResult: (resultId, resultData) => api.put(`/admin/exam-results/${resultId}`, resultData),
   
   // Study Materials
-  getStudyMaterials: (subjectId) => {
-    const url = subjectId ? `/admin/study-materials?subject_id=${subjectId}` : '/admin/study-materials'
-    return api.get(url)
-  },
+  getStudyMaterials: (subjectId) => fetchAllPages('/admin/study-materials', subjectId ? { subject_id: subjectId } : {}),
   createStudyMaterial: (materialData) => api.post('/admin/study-materials', materialData),
   
   // Notices
   getNotices: (params = {}) => {
-    const queryParams = new URLSearchParams()
-    if (params.target_role) queryParams.append('target_role', params.target_role)
-    if (params.active_only !== undefined) queryParams.append('active_only', params.active_only)
-    return api.get(`/admin/notices?${queryParams}`)
+    const queryParams = {}
+    if (params.target_role) queryParams.target_role = params.target_role
+    if (params.active_only !== undefined) queryParams.active_only = params.active_only
+    return fetchAllPages('/admin/notices', queryParams)
   },
   createNotice: (noticeData) => api.post('/admin/notices', noticeData),
   updateNotice: (noticeId, noticeData) => api.put(`/admin/notices/${noticeId}`, noticeData),
   deleteNotice: (noticeId) => api.delete(`/admin/notices/${noticeId}`),
   
   // Teacher Reviews
-  getTeacherReviews: (teacherId) => {
-    const url = teacherId ? `/admin/teacher-reviews?teacher_id=${teacherId}` : '/admin/teacher-reviews'
-    return api.get(url)
-  },
+  getTeacherReviews: (teacherId) => fetchAllPages('/admin/teacher-reviews', teacherId ? { teacher_id: teacherId } : {}),
   createTeacherReview: (reviewData) => api.post('/admin/teacher-reviews', reviewData),
   
   // Class Schedules
   getClassSchedules: (params = {}) => {
-    const queryParams = new URLSearchParams()
-    if (params.day_of_week) queryParams.append('day_of_week', params.day_of_week)
-    if (params.class_id) queryParams.append('class_id', params.class_id)
-    if (params.teacher_id) queryParams.append('teacher_id', params.teacher_id)
-    return api.get(`/admin/class-schedules?${queryParams}`)
+    const queryParams = {}
+    if (params.day_of_week) queryParams.day_of_week = params.day_of_week
+    if (params.class_id) queryParams.class_id = params.class_id
+    if (params.teacher_id) queryParams.teacher_id = params.teacher_id
+    return fetchAllPages('/admin/class-schedules', queryParams)
   },
   createClassSchedule: (scheduleData) => api.post('/admin/class-schedules', scheduleData),
   deleteClassSchedule: (scheduleId) => api.delete(`/admin/class-schedules/${scheduleId}`),
@@ -266,7 +290,7 @@ export const teacherAPI = {
 // Student-specific API functions
 export const studentAPI = {
   getMyProfile: (studentId) => api.get(`/student/${studentId}/profile`),
-  getMyAttendance: (studentId) => api.get(`/student/${studentId}/attendance`),
+  getMyAttendance: (studentId) => fetchAllPages(`/student/${studentId}/attendance`),
   getMyExamResults: (studentId) => api.get(`/student/${studentId}/exam-results`),
   getMySubjects: (studentId) => api.get(`/student/${studentId}/subjects`),
   getStudyMaterials: (studentId) => api.get(`/student/${studentId}/study-materials`),
@@ -6,9 +6,14 @@ class TokenManager {
   constructor() {
     this.tokenKey = config.auth.tokenKey
     this.userKey = config.auth.userKey
+    this.refreshTokenKey = 'refreshToken'
     this.rememberMeKey = 'rememberMe'
     this.expirationWarningKey = 'tokenExpirationWarning'
     this.warningThreshold = 5 * 60 * 1000 // 5 minutes in milliseconds
+    this.refreshPromise = null
+    // Shared by every tab: only one of them may spend a refresh token at a time
+    this.refreshLockName = 'auth-token-refresh'
+    this.refreshLeaseTimeout = 10 * 1000 // fallback lease when navigator.locks is unavailable
   }
 
   /**
@@ -124,13 +129,17 @@ class TokenManager {
    * @param {string} token - JWT token
    * @param {object} user - User data
    * @param {boolean} rememberMe - Whether to remember user
+   * @param {string|null} refreshToken - Refresh token (kept as-is when omitted)
    */
-  storeToken(token, user, rememberMe = false) {
+  storeToken(token, user, rememberMe = false, refreshToken = null) {
     try {
       // Always store in localStorage for session persistence
       localStorage.setItem(this.tokenKey, token)
       localStorage.setItem(this.userKey, JSON.stringify(user))
       localStorage.setItem(this.rememberMeKey, JSON.stringify(rememberMe))
+      if (refreshToken) {
+        localStorage.setItem(this.refreshTokenKey, refreshToken)
+      }
       
       // Reset expiration warning flag
       localStorage.removeItem(this.expirationWarningKey)
@@ -154,6 +163,127 @@ class TokenManager {
     }
   }
 
+  /**
+   * Get stored refresh token
+   * @returns {string|null} - Stored refresh token or null
+   */
+  getRefreshToken() {
+    try {
+      const refreshToken = localStorage.getItem(this.refreshTokenKey)
+      return refreshToken && !this.isTokenExpired(refreshToken) ? refreshToken : null
+    } catch (error) {
+      Logger.error('Error retrieving refresh token:', error)
+      return null
+    }
+  }
+
+  /**
+   * Exchange the refresh token for a new access token (one request at a time, across tabs)
+   * @returns {Promise<string|null>} - New access token or null if the session is over
+   */
+  refreshAccessToken() {
+    if (this.refreshPromise) return this.refreshPromise
+
+    const refreshToken = this.getRefreshToken()
+    if (!refreshToken) return Promise.resolve(null)
+
+    this.refreshPromise = this.withRefreshLock(() => this.exchangeRefreshToken(refreshToken))
+      .catch((error) => {
+        Logger.error('Error refreshing access token:', error)
+        return null
+      })
+      .finally(() => {
+        this.refreshPromise = null
+      })
+
+    return this.refreshPromise
+  }
+
+  /**
+   * Spend the refresh token, unless another tab rotated it while this one waited for the lock.
+   * Refresh tokens are single-use: sending the old one again is treated as replay by the server
+   * and revokes the whole session.
+   * @param {string} refreshToken - Refresh token this tab saw when it decided to refresh
+   * @returns {Promise<string|null>} - Current access token or null if the session is over
+   */
+  async exchangeRefreshToken(refreshToken) {
+    const currentRefreshToken = this.getRefreshToken()
+    if (!currentRefreshToken) return null
+    if (currentRefreshToken !== refreshToken) {
+      const token = this.getToken()
+      if (token && !this.isTokenExpired(token)) {
+        Logger.info('Access token already refreshed by another tab')
+        return token
+      }
+    }
+
+    const response = await fetch(`${config.api.baseURL}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: currentRefreshToken })
+    })
+    if (!response.ok) {
+      // Keep a token another tab stored meanwhile
+      if (localStorage.getItem(this.refreshTokenKey) === currentRefreshToken) {
+        localStorage.removeItem(this.refreshTokenKey)
+      }
+      return null
+    }
+    const data = await response.json()
+    this.storeToken(data.access_token, this.getUser(), this.isRememberMeEnabled(), data.refresh_token)
+    Logger.info('Access token refreshed')
+    return data.access_token
+  }
+
+  /**
+   * Run a task while holding the cross-tab refresh lock
+   * @param {Function} task - Async function to run under the lock
+   * @returns {Promise<*>} - Result of the task
+   */
+  withRefreshLock(task) {
+    if (typeof navigator !== 'undefined' && navigator.locks) {
+      return navigator.locks.request(this.refreshLockName, task)
+    }
+    return this.withRefreshLease(task)
+  }
+
+  /**
+   * Best-effort localStorage lease for browsers without the Web Locks API.
+   * A lease left behind by a closed tab expires after refreshLeaseTimeout.
+   * @param {Function} task - Async function to run under the lease
+   * @returns {Promise<*>} - Result of the task
+   */
+  async withRefreshLease(task) {
+    const owner = `${Date.now()}-${Math.random().toString(36).slice(2)}`
+    const readLease = () => {
+      try {
+        return JSON.parse(localStorage.getItem(this.refreshLockName))
+      } catch {
+        return null
+      }
+    }
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+    const deadline = Date.now() + this.refreshLeaseTimeout
+    while (Date.now() < deadline) {
+      const lease = readLease()
+      if (!lease || lease.expires < Date.now()) {
+        localStorage.setItem(this.refreshLockName, JSON.stringify({ owner, expires: Date.now() + this.refreshLeaseTimeout }))
+        // Let simultaneous claims from other tabs land; the last writer holds the lease
+        await sleep(50)
+        if (readLease()?.owner === owner) {
+          try {
+            return await task()
+          } finally {
+            if (readLease()?.owner === owner) localStorage.removeItem(this.refreshLockName)
+          }
+        }
+      }
+      await sleep(100)
+    }
+    return task()
+  }
+
   /**
    * Get stored user data
    * @returns {object|null} - Stored user data or null
@@ -212,6 +342,7 @@ class TokenManager {
   clearAuth() {
     try {
       localStorage.removeItem(this.tokenKey)
+      localStorage.removeItem(this.refreshTokenKey)
       localStorage.removeItem(this.userKey)
       localStorage.removeItem(this.rememberMeKey)
       localStorage.removeItem(this.expirationWarningKey)
@@ -262,6 +393,11 @@ class TokenManager {
     const tokenStatus = this.validateToken()
     const rememberMe = this.isRememberMeEnabled()
     
+    // An expired access token can still be renewed while the refresh token is valid
+    if (this.getUser() && this.getRefreshToken()) {
+      return true
+    }
+    
     // If remember me is enabled and token is not expired, stay logged in
     if (rememberMe && tokenStatus.isValid) {
       return true